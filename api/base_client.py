@@ -7,18 +7,86 @@ error handling, and session management.
 
 import requests
 import json
+import logging
+import threading
+import time
 import urllib3
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator, Tuple
 from abc import ABC, abstractmethod
+from utils.helpers import json_loads
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+logger = logging.getLogger(__name__)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter applying a default timeout to every request"""
+    
+    def __init__(self, timeout: int, **kwargs):
+        """
+        Initialize adapter
+        
+        Args:
+            timeout: Default request timeout in seconds
+            **kwargs: HTTPAdapter arguments
+        """
+        self.timeout = timeout
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        """Send request, using the default timeout unless one was given"""
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting the number of requests per second"""
+    
+    def __init__(self, rate: float = 0):
+        """
+        Initialize rate limiter
+        
+        Args:
+            rate: Maximum requests per second (0 disables limiting)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class BaseAPIClient(ABC):
     """Base class for API clients with common functionality"""
     
-    def __init__(self, base_url: str, verify_ssl: bool = False, timeout: int = 30):
+    # Maximum total size in bytes of the GET response bodies kept for conditional requests
+    RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+    
+    def __init__(self, base_url: str, verify_ssl: bool = False, timeout: int = 30, max_workers: int = 16,
+                 rate_rps: float = 0):
         """
         Initialize base API client
         
@@ -26,14 +94,46 @@ class BaseAPIClient(ABC):
             base_url: API server URL
             verify_ssl: Whether to verify SSL certificates
             timeout: Request timeout in seconds
+            max_workers: Maximum number of concurrent requests
+            rate_rps: Maximum requests per second (0 for unlimited)
         """
         self.base_url = base_url.rstrip('/')
         self.verify_ssl = verify_ssl
         self.timeout = timeout
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_rps)
         self.session = requests.Session()
+        
+        # Validators and raw bodies of GET responses, keyed by URL and params.
+        # Bodies are re-parsed on a 304 so callers never share parsed objects.
+        self._response_cache: Dict[Tuple, Tuple[Optional[str], Optional[str], bytes]] = {}
+        self._response_cache_bytes = 0
+        self._response_cache_lock = threading.Lock()
+        
+        # Size the connection pool to the request concurrency and retry
+        # transient failures with exponential backoff, honouring Retry-After.
+        # A blocking pool makes extra threads wait for a kept-alive connection
+        # instead of opening throwaway ones with a fresh TLS handshake.
+        adapter = TimeoutHTTPAdapter(
+            timeout,
+            pool_connections=4,
+            pool_maxsize=max_workers,
+            pool_block=True,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 502, 503, 504],
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
         })
+        # Advertise every content encoding urllib3 can decode (brotli when installed)
+        self.session.headers.update(make_headers(accept_encoding=True))
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
         """
@@ -49,21 +149,41 @@ class BaseAPIClient(ABC):
         """
         url = f"{self.base_url}{endpoint}"
         
+        # Make GET requests conditional when a previous response had validators
+        cache_key = None
+        cached = None
+        if method == 'GET':
+            cache_key = self._get_cache_key(url, kwargs.get('params'))
+            cached = self._response_cache.get(cache_key)
+            if cached:
+                etag, last_modified, _ = cached
+                headers = dict(kwargs.get('headers') or {})
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+                kwargs['headers'] = headers
+        
+        self.rate_limiter.acquire()
+        
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                verify=self.verify_ssl,
-                timeout=self.timeout,
-                **kwargs
-            )
+            # verify is passed per request: requests lets REQUESTS_CA_BUNDLE and
+            # CURL_CA_BUNDLE override a session-level verify=False
+            response = self.session.request(method, url, verify=self.verify_ssl, **kwargs)
             response.raise_for_status()
             
+            # Unchanged since the cached response
+            if response.status_code == 304 and cached:  # Not Modified
+                return json_loads(cached[2])
+            
             # Handle empty responses
             if response.status_code == 204:  # No Content
                 return None
-                
-            return response.json()
+            
+            data = json_loads(response.content)
+            if cache_key is not None:
+                self._store_cached_response(cache_key, response)
+            return data
             
         except requests.exceptions.RequestException as e:
             self._handle_request_error(e, method, endpoint)
@@ -72,6 +192,32 @@ class BaseAPIClient(ABC):
             self._handle_json_error(e, method, endpoint)
             return None
     
+    def _get_cache_key(self, url: str, params: Optional[Dict]) -> Tuple:
+        """Build a response cache key from URL and query parameters"""
+        if not params:
+            return (url,)
+        return (url,) + tuple(sorted((str(key), str(value)) for key, value in params.items()))
+    
+    def _store_cached_response(self, cache_key: Tuple, response: requests.Response):
+        """Remember a raw GET response body if the server sent cache validators"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        body = response.content
+        
+        with self._response_cache_lock:
+            previous = self._response_cache.pop(cache_key, None)
+            if previous:
+                self._response_cache_bytes -= len(previous[2])
+            if (not etag and not last_modified) or len(body) > self.RESPONSE_CACHE_BYTES:
+                return
+            
+            # Evict the oldest entries until the body fits
+            while self._response_cache and self._response_cache_bytes + len(body) > self.RESPONSE_CACHE_BYTES:
+                evicted = self._response_cache.pop(next(iter(self._response_cache)))
+                self._response_cache_bytes -= len(evicted[2])
+            self._response_cache[cache_key] = (etag, last_modified, body)
+            self._response_cache_bytes += len(body)
+    
     def get(self, endpoint: str, **kwargs) -> Optional[Dict]:
         """Make GET request"""
         return self._make_request('GET', endpoint, **kwargs)
@@ -92,13 +238,45 @@ class BaseAPIClient(ABC):
         """Make DELETE request"""
         return self._make_request('DELETE', endpoint, **kwargs)
     
+    def _map_concurrent(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Apply a request function to each item concurrently
+        
+        Args:
+            func: Function issuing a single request for one item
+            items: Items to process
+            
+        Returns:
+            List of results in the same order as items
+        """
+        return list(self._iter_concurrent(func, items))
+    
+    def _iter_concurrent(self, func: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Apply a request function to each item concurrently, yielding results as they complete in order
+        
+        Args:
+            func: Function issuing a single request for one item
+            items: Items to process
+            
+        Yields:
+            Results in the same order as items
+        """
+        items = list(items)
+        if len(items) <= 1:
+            yield from map(func, items)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            yield from executor.map(func, items)
+    
     def _handle_request_error(self, error: Exception, method: str, endpoint: str):
         """Handle HTTP request errors"""
-        print(f"Request error ({method} {endpoint}): {error}")
+        logger.warning("Request error (%s %s): %s", method, endpoint, error)
     
     def _handle_json_error(self, error: Exception, method: str, endpoint: str):
         """Handle JSON parsing errors"""
-        print(f"JSON parsing error ({method} {endpoint}): {error}")
+        logger.warning("JSON parsing error (%s %s): %s", method, endpoint, error)
     
     @abstractmethod
     def test_connection(self) -> bool:
@@ -108,4 +286,5 @@ class BaseAPIClient(ABC):
     def close(self):
         """Close the session"""
         if self.session:
-            self.session.close() 
\ No newline at end of file
+            self.session.close()
+            self.session = None 
\ No newline at end of file
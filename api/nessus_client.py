@@ -4,14 +4,35 @@ Nessus API Client
 Client for interacting with the Nessus vulnerability scanner API.
 """
 
-from typing import Dict, List, Optional
+import logging
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from .base_client import BaseAPIClient
+from utils.helpers import normalize_ip
+
+logger = logging.getLogger(__name__)
 
 
 class NessusClient(BaseAPIClient):
     """Nessus API client for fetching agent data"""
     
-    def __init__(self, base_url: str, access_key: str, secret_key: str, verify_ssl: bool = False):
+    # Seconds before the agent IP index is rebuilt from the agents list
+    AGENT_INDEX_TTL = 60
+    
+    # IPv4 addresses embedded in free-text agent fields such as distro
+    IP_PATTERN = re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}\b')
+    
+    # API endpoints
+    SERVER_PROPERTIES_ENDPOINT = '/server/properties'
+    AGENTS_ENDPOINT = '/agents'
+    AGENT_ENDPOINT = '/agents/{}'.format
+    SCANS_ENDPOINT = '/scans'
+    SCAN_ENDPOINT = '/scans/{}'.format
+    SCAN_RESULTS_ENDPOINT = '/scans/{}/results'.format
+    
+    def __init__(self, base_url: str, access_key: str, secret_key: str, verify_ssl: bool = False,
+                 rate_rps: float = 0, max_workers: int = 16):
         """
         Initialize Nessus API client
         
@@ -20,21 +41,32 @@ class NessusClient(BaseAPIClient):
             access_key: API access key
             secret_key: API secret key
             verify_ssl: Whether to verify SSL certificates
+            rate_rps: Maximum requests per second (0 for unlimited)
+            max_workers: Maximum number of concurrent requests
         """
-        super().__init__(base_url, verify_ssl)
+        super().__init__(base_url, verify_ssl, max_workers=max_workers, rate_rps=rate_rps)
         
         # Set Nessus-specific headers
         self.session.headers.update({
             'X-ApiKeys': f'accessKey={access_key}; secretKey={secret_key}'
         })
+        
+        # Agents keyed by IP address, see _get_agent_ip_index
+        self._agent_ip_index: Optional[Dict[str, List[Dict]]] = None
+        self._unindexed_agents: List[Dict] = []
+        self._agent_index_time = 0.0
+        
+        # Details of the unindexed agents keyed by IP address, built on the
+        # first search after each index rebuild and dropped with the index
+        self._detail_ip_index: Optional[Dict[str, List[Dict]]] = None
     
     def test_connection(self) -> bool:
         """Test connection to Nessus API"""
         try:
-            response = self.get('/server/properties')
+            response = self.get(self.SERVER_PROPERTIES_ENDPOINT)
             return response is not None
         except Exception as e:
-            print(f"Connection test failed: {e}")
+            logger.warning("Connection test failed: %s", e)
             return False
     
     def get_agents(self) -> List[Dict]:
@@ -44,7 +76,7 @@ class NessusClient(BaseAPIClient):
         Returns:
             List of agent dictionaries
         """
-        response = self.get('/agents')
+        response = self.get(self.AGENTS_ENDPOINT)
         if response:
             return response.get('agents', [])
         return []
@@ -59,7 +91,33 @@ class NessusClient(BaseAPIClient):
         Returns:
             Agent details dictionary or None if error
         """
-        return self.get(f'/agents/{agent_id}')
+        return self.get(self.AGENT_ENDPOINT(agent_id))
+    
+    def get_agents_details(self, agent_ids: List[int]) -> List[Optional[Dict]]:
+        """
+        Fetch detailed information for several agents concurrently
+        
+        Args:
+            agent_ids: Agent IDs
+            
+        Returns:
+            List of agent details dictionaries (None where a request failed),
+            in the same order as agent_ids
+        """
+        return self._map_concurrent(self.get_agent_details, agent_ids)
+    
+    def iter_agents_details(self, agent_ids: List[int]) -> Iterator[Optional[Dict]]:
+        """
+        Fetch detailed information for several agents concurrently, yielding it in order
+        
+        Args:
+            agent_ids: Agent IDs
+            
+        Yields:
+            Agent details dictionaries (None where a request failed), in the
+            same order as agent_ids
+        """
+        return self._iter_concurrent(self.get_agent_details, agent_ids)
     
     def get_scans(self) -> List[Dict]:
         """
@@ -68,7 +126,7 @@ class NessusClient(BaseAPIClient):
         Returns:
             List of scan dictionaries
         """
-        response = self.get('/scans')
+        response = self.get(self.SCANS_ENDPOINT)
         if response:
             return response.get('scans', [])
         return []
@@ -83,7 +141,7 @@ class NessusClient(BaseAPIClient):
         Returns:
             Scan details dictionary or None if error
         """
-        return self.get(f'/scans/{scan_id}')
+        return self.get(self.SCAN_ENDPOINT(scan_id))
     
     def get_scan_results(self, scan_id: int) -> Optional[Dict]:
         """
@@ -95,7 +153,7 @@ class NessusClient(BaseAPIClient):
         Returns:
             Scan results dictionary or None if error
         """
-        return self.get(f'/scans/{scan_id}/results')
+        return self.get(self.SCAN_RESULTS_ENDPOINT(scan_id))
     
     def get_agents_by_ip(self, ip_address: str) -> List[Dict]:
         """
@@ -107,32 +165,87 @@ class NessusClient(BaseAPIClient):
         Returns:
             List of agent dictionaries with matching IP
         """
-        # Get all agents first
-        all_agents = self.get_agents()
-        matching_agents = []
+        ip_address = normalize_ip(ip_address) or ip_address
+        index = self._get_agent_ip_index()
+        matching_agents = list(index.get(ip_address, []))
         
-        for agent in all_agents:
-            # Check if agent has IP information
-            agent_ip = agent.get('distro', '')  # Some agents store IP in distro field
-            if ip_address in agent_ip:
-                matching_agents.append(agent)
-                continue
+        # Agents whose listed fields hold no address are matched on their details
+        if self._detail_ip_index is None:
+            all_details = self.get_agents_details([agent['id'] for agent in self._unindexed_agents])
+            self._detail_ip_index, _ = self._build_ip_index(details for details in all_details if details)
+        matching_agents.extend(self._detail_ip_index.get(ip_address, []))
+        
+        return matching_agents
+    
+    def _get_agent_ip_index(self) -> Dict[str, List[Dict]]:
+        """
+        Get the agent IP index, rebuilding it once it is older than AGENT_INDEX_TTL
+        
+        Returns:
+            Dictionary mapping IP address to list of agent dictionaries
+        """
+        if self._agent_ip_index is None or time.monotonic() - self._agent_index_time > self.AGENT_INDEX_TTL:
+            self.index_agents(self.get_agents())
+        return self._agent_ip_index
+    
+    def index_agents(self, agents: List[Dict]):
+        """
+        Index agents by their IP addresses, see _agent_ips
+        
+        Args:
+            agents: Agent dictionaries, e.g. from an earlier get_agents call
+        """
+        self._agent_ip_index, self._unindexed_agents = self._build_ip_index(agents)
+        self._detail_ip_index = None
+        self._agent_index_time = time.monotonic()
+    
+    def _build_ip_index(self, agents: Iterable[Dict]) -> Tuple[Dict[str, List[Dict]], List[Dict]]:
+        """
+        Index agents by their normalized IP addresses
+        
+        Args:
+            agents: Agent or agent details dictionaries
             
-            # Check other possible IP fields
-            if 'ip' in agent and ip_address in str(agent['ip']):
-                matching_agents.append(agent)
+        Returns:
+            Tuple of the index and the agents with IP information that holds no address
+        """
+        index = {}
+        unindexed = []
+        
+        for agent in agents:
+            ips = self._agent_ips(agent)
+            if not ips:
+                # Only agents with some IP information are worth a details request
+                if agent.get('id') and (agent.get('ip') or agent.get('distro')):
+                    unindexed.append(agent)
                 continue
+            for ip in ips:
+                index.setdefault(ip, []).append(agent)
+        
+        return index, unindexed
+    
+    def _agent_ips(self, agent: Dict) -> Set[str]:
+        """
+        Get the normalized IP addresses of an agent
+        
+        The ip (or primary_ip) field is used when it holds a valid IPv4 or
+        IPv6 address. Otherwise IPv4 addresses are scanned from the ip and
+        distro fields.
+        
+        Args:
+            agent: Agent or agent details dictionary
             
-            # Check in agent details if available
-            agent_id = agent.get('id')
-            if agent_id:
-                details = self.get_agent_details(agent_id)
-                if details:
-                    # Check various IP fields in details
-                    detail_ip = details.get('distro', '') or details.get('ip', '') or details.get('primary_ip', '')
-                    if ip_address in str(detail_ip):
-                        matching_agents.append(details)
-                    else:
-                        matching_agents.append(agent)
-        
-        return matching_agents 
\ No newline at end of file
+        Returns:
+            Set of normalized IP addresses
+        """
+        ip = normalize_ip(agent.get('ip') or agent.get('primary_ip') or '')
+        if ip:
+            return {ip}
+        
+        ips = set()
+        for field in ('ip', 'distro'):
+            for found in self.IP_PATTERN.findall(str(agent.get(field) or '')):
+                ip = normalize_ip(found)
+                if ip:
+                    ips.add(ip)
+        return ips
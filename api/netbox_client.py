@@ -4,14 +4,43 @@ Netbox API Client
 Client for interacting with the Netbox network infrastructure management API.
 """
 
-from typing import Dict, List, Optional
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
 from .base_client import BaseAPIClient
+from utils.helpers import normalize_ip
+
+logger = logging.getLogger(__name__)
 
 
 class NetboxClient(BaseAPIClient):
     """Netbox API client for managing network infrastructure data"""
     
-    def __init__(self, base_url: str, token: str, verify_ssl: bool = False):
+    # Default page size for paginated list endpoints
+    PAGE_LIMIT = 1000
+    
+    # Maximum number of values in a single multi-value filter request
+    IP_BATCH_SIZE = 200
+    
+    # Maximum number of device names in a single name-filtered lookup
+    NAME_BATCH_SIZE = 100
+    
+    # Maximum number of objects in a single bulk create or update request
+    BULK_BATCH_SIZE = 100
+    
+    # API endpoints
+    STATUS_ENDPOINT = '/api/'
+    DEVICES_ENDPOINT = '/api/dcim/devices/'
+    DEVICE_ENDPOINT = '/api/dcim/devices/{}/'.format
+    DEVICE_INTERFACES_ENDPOINT = '/api/dcim/interfaces/'
+    SITES_ENDPOINT = '/api/dcim/sites/'
+    IP_ADDRESSES_ENDPOINT = '/api/ipam/ip-addresses/'
+    VULNERABILITIES_ENDPOINT = '/api/vulnerabilities/vulnerabilities/'
+    VMS_ENDPOINT = '/api/virtualization/virtual-machines/'
+    VM_ENDPOINT = '/api/virtualization/virtual-machines/{}/'.format
+    VM_INTERFACES_ENDPOINT = '/api/virtualization/interfaces/'
+    
+    def __init__(self, base_url: str, token: str, verify_ssl: bool = False, rate_rps: float = 0, max_workers: int = 16):
         """
         Initialize Netbox API client
         
@@ -19,8 +48,10 @@ class NetboxClient(BaseAPIClient):
             base_url: Netbox server URL (e.g., https://netbox-server)
             token: API token
             verify_ssl: Whether to verify SSL certificates
+            rate_rps: Maximum requests per second (0 for unlimited)
+            max_workers: Maximum number of concurrent requests
         """
-        super().__init__(base_url, verify_ssl)
+        super().__init__(base_url, verify_ssl, max_workers=max_workers, rate_rps=rate_rps)
         # Set Netbox-specific headers
         self.session.headers.update({
             'Authorization': f'Token {token}'
@@ -29,12 +60,107 @@ class NetboxClient(BaseAPIClient):
     def test_connection(self) -> bool:
         """Test connection to Netbox API"""
         try:
-            response = self.get('/api/')
+            response = self.get(self.STATUS_ENDPOINT)
             return response is not None
         except Exception as e:
-            print(f"Connection test failed: {e}")
+            logger.warning("Connection test failed: %s", e)
             return False
     
+    def _paginate(self, endpoint: str, params: Optional[Dict] = None, limit: int = PAGE_LIMIT) -> List[Dict]:
+        """
+        Fetch all results from a paginated list endpoint
+        
+        The first page is fetched to learn the total count, then the
+        remaining pages are fetched concurrently.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            limit: Number of results per page
+            
+        Returns:
+            List of result dictionaries in page order
+        """
+        params = dict(params or {})
+        
+        def page_params(offset: int) -> Dict:
+            page = params.copy()
+            page['limit'] = limit
+            page['offset'] = offset
+            return page
+        
+        def fetch_page(offset: int) -> List[Dict]:
+            response = self.get(endpoint, params=page_params(offset))
+            if response and 'results' in response:
+                return response['results']
+            return []
+        
+        response = self.get(endpoint, params=page_params(0))
+        if not response or 'results' not in response:
+            return []
+        
+        results = list(response['results'])
+        if not response.get('next'):
+            return results
+        
+        count = response.get('count') or 0
+        for page in self._map_concurrent(fetch_page, range(limit, count, limit)):
+            results.extend(page)
+        return results
+    
+    def _iter_paginate(self, endpoint: str, params: Optional[Dict] = None, limit: int = PAGE_LIMIT) -> Iterator[Dict]:
+        """
+        Iterate over all results from a paginated list endpoint
+        
+        Pages are fetched as the iterator is consumed. The next page is
+        requested in the background while the current one is consumed, so
+        at most two pages of results are held in memory.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            limit: Number of results per page
+            
+        Yields:
+            Result dictionaries
+        """
+        params = dict(params or {})
+        
+        def fetch_page(offset: int) -> Optional[Dict]:
+            page_params = params.copy()
+            page_params['limit'] = limit
+            page_params['offset'] = offset
+            return self.get(endpoint, params=page_params)
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            response = fetch_page(offset)
+            while response and 'results' in response:
+                next_page = None
+                if response.get('next'):
+                    offset += limit
+                    next_page = executor.submit(fetch_page, offset)
+                
+                yield from response['results']
+                if next_page is None:
+                    return
+                response = next_page.result()
+    
+    def iter_devices(self, **params) -> Iterator[Dict]:
+        """
+        Iterate over devices from Netbox, one page at a time
+        
+        Args:
+            **params: Query parameters (name, site, status, etc.)
+            
+        Yields:
+            Device dictionaries
+        """
+        if 'include' not in params:
+            params['include'] = 'interfaces,interfaces.ip_addresses'
+        
+        return self._iter_paginate(self.DEVICES_ENDPOINT, params)
+    
     def get_devices(self, **params) -> List[Dict]:
         """
         Fetch devices from Netbox (with pagination)
@@ -45,29 +171,11 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of device dictionaries
         """
-        devices = []
-        limit = 1000
-        offset = 0
-        
         # Add include parameter to get interface details
         if 'include' not in params:
             params['include'] = 'interfaces,interfaces.ip_addresses'
         
-        while True:
-            page_params = params.copy()
-            page_params['limit'] = limit
-            page_params['offset'] = offset
-            response = self.get('/api/dcim/devices/', params=page_params)
-            if response and 'results' in response:
-                results = response['results']
-                devices.extend(results)
-                if response.get('next'):
-                    offset += limit
-                else:
-                    break
-            else:
-                break
-        return devices
+        return self._paginate(self.DEVICES_ENDPOINT, params)
     
     def get_device(self, device_id: int) -> Optional[Dict]:
         """
@@ -79,7 +187,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             Device dictionary or None if error
         """
-        return self.get(f'/api/dcim/devices/{device_id}/')
+        return self.get(self.DEVICE_ENDPOINT(device_id))
     
     def create_device(self, device_data: Dict) -> Optional[Dict]:
         """
@@ -91,7 +199,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             Created device dictionary or None if error
         """
-        return self.post('/api/dcim/devices/', data=device_data)
+        return self.post(self.DEVICES_ENDPOINT, data=device_data)
     
     def update_device(self, device_id: int, device_data: Dict) -> Optional[Dict]:
         """
@@ -104,7 +212,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             Updated device dictionary or None if error
         """
-        return self.put(f'/api/dcim/devices/{device_id}/', data=device_data)
+        return self.put(self.DEVICE_ENDPOINT(device_id), data=device_data)
     
     def delete_device(self, device_id: int) -> bool:
         """
@@ -116,9 +224,91 @@ class NetboxClient(BaseAPIClient):
         Returns:
             True if successful, False otherwise
         """
-        response = self.delete(f'/api/dcim/devices/{device_id}/')
+        response = self.delete(self.DEVICE_ENDPOINT(device_id))
         return response is not None
     
+    def get_devices_by_names(self, names: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch the devices with the given names in batched requests
+        
+        Args:
+            names: Device names to look up, sent NAME_BATCH_SIZE per request
+            
+        Returns:
+            Dictionary mapping each found name to its device dictionary
+        """
+        names = list(dict.fromkeys(name for name in names if name))
+        devices = {}
+        
+        for start in range(0, len(names), self.NAME_BATCH_SIZE):
+            for device in self.get_devices(name=names[start:start + self.NAME_BATCH_SIZE]):
+                devices.setdefault(device.get('name'), device)
+        
+        return devices
+    
+    def _bulk_write(self, send: Callable[[List[Dict]], Optional[List[Dict]]],
+                    send_one: Callable[[Dict], Optional[Dict]], items: List[Dict]) -> List[Dict]:
+        """
+        Write objects through a bulk endpoint in batches of BULK_BATCH_SIZE
+        
+        Netbox applies a bulk request atomically, so a batch that fails is
+        retried one object at a time to keep the valid objects in it.
+        
+        Args:
+            send: Function sending a list of objects in one request
+            send_one: Function sending a single object
+            items: Objects to write
+            
+        Returns:
+            List of written object dictionaries
+        """
+        written = []
+        
+        for start in range(0, len(items), self.BULK_BATCH_SIZE):
+            batch = items[start:start + self.BULK_BATCH_SIZE]
+            result = send(batch)
+            if isinstance(result, list):
+                written.extend(result)
+                continue
+            for item in batch:
+                result = send_one(item)
+                if result:
+                    written.append(result)
+        
+        return written
+    
+    def create_devices(self, devices_data: List[Dict]) -> List[Dict]:
+        """
+        Create many devices with bulk requests
+        
+        Args:
+            devices_data: Device data dictionaries
+            
+        Returns:
+            List of created device dictionaries
+        """
+        return self._bulk_write(
+            lambda batch: self.post(self.DEVICES_ENDPOINT, data=batch),
+            self.create_device,
+            devices_data
+        )
+    
+    def update_devices(self, devices_data: List[Dict]) -> List[Dict]:
+        """
+        Update many existing devices with bulk requests
+        
+        Args:
+            devices_data: Updated device data dictionaries, each including the device 'id'
+            
+        Returns:
+            List of updated device dictionaries
+        """
+        return self._bulk_write(
+            lambda batch: self.put(self.DEVICES_ENDPOINT, data=batch),
+            lambda device_data: self.update_device(device_data['id'], device_data),
+            devices_data
+        )
+    
     def get_sites(self, **params) -> List[Dict]:
         """
         Fetch sites from Netbox
@@ -129,7 +319,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of site dictionaries
         """
-        response = self.get('/api/dcim/sites/', params=params)
+        response = self.get(self.SITES_ENDPOINT, params=params)
         if response:
             return response.get('results', [])
         return []
@@ -144,25 +334,19 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of IP address dictionaries
         """
-        ip_addresses = []
-        limit = 1000
-        offset = 0
+        return self._paginate(self.IP_ADDRESSES_ENDPOINT, params)
+    
+    def iter_ip_addresses(self, **params) -> Iterator[Dict]:
+        """
+        Iterate over IP addresses from Netbox, one page at a time
         
-        while True:
-            page_params = params.copy()
-            page_params['limit'] = limit
-            page_params['offset'] = offset
-            response = self.get('/api/ipam/ip-addresses/', params=page_params)
-            if response and 'results' in response:
-                results = response['results']
-                ip_addresses.extend(results)
-                if response.get('next'):
-                    offset += limit
-                else:
-                    break
-            else:
-                break
-        return ip_addresses
+        Args:
+            **params: Query parameters
+            
+        Yields:
+            IP address dictionaries
+        """
+        return self._iter_paginate(self.IP_ADDRESSES_ENDPOINT, params)
     
     def create_ip_address(self, ip_data: Dict) -> Optional[Dict]:
         """
@@ -174,7 +358,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             Created IP address dictionary or None if error
         """
-        return self.post('/api/ipam/ip-addresses/', data=ip_data)
+        return self.post(self.IP_ADDRESSES_ENDPOINT, data=ip_data)
     
     def get_vulnerabilities(self, **params) -> List[Dict]:
         """
@@ -186,7 +370,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of vulnerability dictionaries
         """
-        response = self.get('/api/vulnerabilities/vulnerabilities/', params=params)
+        response = self.get(self.VULNERABILITIES_ENDPOINT, params=params)
         if response:
             return response.get('results', [])
         return []
@@ -201,7 +385,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of interface dictionaries
         """
-        response = self.get(f'/api/virtualization/interfaces/', params={'virtual_machine_id': vm_id})
+        response = self.get(self.VM_INTERFACES_ENDPOINT, params={'virtual_machine_id': vm_id})
         if response:
             return response.get('results', [])
         return []
@@ -216,7 +400,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of interface dictionaries
         """
-        response = self.get(f'/api/dcim/interfaces/', params={'device_id': device_id})
+        response = self.get(self.DEVICE_INTERFACES_ENDPOINT, params={'device_id': device_id})
         if response:
             return response.get('results', [])
         return []
@@ -231,25 +415,19 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of virtual machine dictionaries
         """
-        vms = []
-        limit = 1000
-        offset = 0
+        return self._paginate(self.VMS_ENDPOINT, params)
+    
+    def iter_virtual_machines(self, **params) -> Iterator[Dict]:
+        """
+        Iterate over virtual machines from Netbox, one page at a time
         
-        while True:
-            page_params = params.copy()
-            page_params['limit'] = limit
-            page_params['offset'] = offset
-            response = self.get('/api/virtualization/virtual-machines/', params=page_params)
-            if response and 'results' in response:
-                results = response['results']
-                vms.extend(results)
-                if response.get('next'):
-                    offset += limit
-                else:
-                    break
-            else:
-                break
-        return vms
+        Args:
+            **params: Query parameters (name, site, status, etc.)
+            
+        Yields:
+            Virtual machine dictionaries
+        """
+        return self._iter_paginate(self.VMS_ENDPOINT, params)
     
     def get_virtual_machine(self, vm_id: int) -> Optional[Dict]:
         """
@@ -261,7 +439,88 @@ class NetboxClient(BaseAPIClient):
         Returns:
             Virtual machine dictionary or None if error
         """
-        return self.get(f'/api/virtualization/virtual-machines/{vm_id}/')
+        return self.get(self.VM_ENDPOINT(vm_id))
+    
+    def _get_ip_assignments(self, ip_list: List[str], interface_type: str, parent_key: str) -> Dict[str, List[int]]:
+        """
+        Map IP addresses to the IDs of the devices or VMs whose interfaces they are assigned to
+        
+        Args:
+            ip_list: Normalized IP addresses to look up
+            interface_type: Assigned object type of the interfaces (e.g., dcim.interface)
+            parent_key: Interface field referencing its parent ('device' or 'virtual_machine')
+            
+        Returns:
+            Dictionary mapping each IP address to a list of object IDs
+        """
+        assignments = {ip: [] for ip in ip_list}
+        
+        for start in range(0, len(ip_list), self.IP_BATCH_SIZE):
+            batch = ip_list[start:start + self.IP_BATCH_SIZE]
+            for ip_info in self._paginate(self.IP_ADDRESSES_ENDPOINT, {'address': batch}):
+                if ip_info.get('assigned_object_type') != interface_type:
+                    continue
+                parent = (ip_info.get('assigned_object') or {}).get(parent_key)
+                object_id = parent.get('id') if parent else None
+                ip = normalize_ip(ip_info.get('address') or '')
+                if object_id and ip in assignments and object_id not in assignments[ip]:
+                    assignments[ip].append(object_id)
+        
+        return assignments
+    
+    def _get_assigned_by_ips(self, ip_list: List[str], interface_type: str, parent_key: str,
+                             fetch_objects: Callable[..., List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Fetch the devices or VMs that have each of the given IP addresses on an interface
+        
+        Args:
+            ip_list: IP addresses to search for
+            interface_type: Assigned object type of the interfaces (e.g., dcim.interface)
+            parent_key: Interface field referencing its parent ('device' or 'virtual_machine')
+            fetch_objects: List method accepting an id filter (e.g., get_devices)
+            
+        Returns:
+            Dictionary mapping each normalized IP address to a list of object dictionaries
+        """
+        ips = list(dict.fromkeys(ip for ip in map(normalize_ip, ip_list) if ip))
+        assignments = self._get_ip_assignments(ips, interface_type, parent_key)
+        
+        # Fetch all assigned objects with batched id-filtered list requests
+        object_ids = list(dict.fromkeys(object_id for ids in assignments.values() for object_id in ids))
+        objects = {}
+        for start in range(0, len(object_ids), self.IP_BATCH_SIZE):
+            for item in fetch_objects(id=object_ids[start:start + self.IP_BATCH_SIZE]):
+                objects[item.get('id')] = item
+        
+        return {
+            ip: [objects[object_id] for object_id in ids if object_id in objects]
+            for ip, ids in assignments.items()
+        }
+    
+    def get_devices_by_ips(self, ip_list: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Fetch devices for many IP addresses using batched requests
+        
+        Args:
+            ip_list: IP addresses to search for
+            
+        Returns:
+            Dictionary mapping each normalized IP address to a list of device dictionaries
+        """
+        return self._get_assigned_by_ips(ip_list, 'dcim.interface', 'device', self.get_devices)
+    
+    def get_vms_by_ips(self, ip_list: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Fetch virtual machines for many IP addresses using batched requests
+        
+        Args:
+            ip_list: IP addresses to search for
+            
+        Returns:
+            Dictionary mapping each normalized IP address to a list of virtual machine dictionaries
+        """
+        return self._get_assigned_by_ips(ip_list, 'virtualization.vminterface', 'virtual_machine',
+                                         self.get_virtual_machines)
     
     def get_devices_by_ip(self, ip_address: str) -> List[Dict]:
         """
@@ -273,24 +532,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of device dictionaries with matching IP
         """
-        # First get IP addresses that match
-        ip_response = self.get('/api/ipam/ip-addresses/', params={'address': ip_address})
-        if not ip_response:
-            return []
-        
-        matching_ips = ip_response.get('results', [])
-        devices = []
-        
-        for ip_info in matching_ips:
-            # Check if IP is assigned to a device
-            if ip_info.get('assigned_object_type') == 'dcim.device':
-                device_id = ip_info.get('assigned_object_id')
-                if device_id:
-                    device = self.get_device(device_id)
-                    if device:
-                        devices.append(device)
-        
-        return devices
+        return self.get_devices_by_ips([ip_address]).get(normalize_ip(ip_address), [])
     
     def get_vms_by_ip(self, ip_address: str) -> List[Dict]:
         """
@@ -302,24 +544,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of virtual machine dictionaries with matching IP
         """
-        # First get IP addresses that match
-        ip_response = self.get('/api/ipam/ip-addresses/', params={'address': ip_address})
-        if not ip_response:
-            return []
-        
-        matching_ips = ip_response.get('results', [])
-        vms = []
-        
-        for ip_info in matching_ips:
-            # Check if IP is assigned to a virtual machine
-            if ip_info.get('assigned_object_type') == 'virtualization.virtualmachine':
-                vm_id = ip_info.get('assigned_object_id')
-                if vm_id:
-                    vm = self.get_virtual_machine(vm_id)
-                    if vm:
-                        vms.append(vm)
-        
-        return vms
+        return self.get_vms_by_ips([ip_address]).get(normalize_ip(ip_address), [])
     
     def get_ips_for_vm(self, vm_id: int) -> List[Dict]:
         """
@@ -331,7 +556,7 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of IP address dictionaries
         """
-        response = self.get(f'/api/ipam/ip-addresses/', params={'virtual_machine_id': vm_id})
+        response = self.get(self.IP_ADDRESSES_ENDPOINT, params={'virtual_machine_id': vm_id})
         if response:
             return response.get('results', [])
         return []
@@ -346,53 +571,78 @@ class NetboxClient(BaseAPIClient):
         Returns:
             List of IP address dictionaries
         """
-        response = self.get(f'/api/ipam/ip-addresses/', params={'device_id': device_id})
+        response = self.get(self.IP_ADDRESSES_ENDPOINT, params={'device_id': device_id})
         if response:
             return response.get('results', [])
         return []
     
-    def get_all_vm_interfaces(self, limit=1000) -> list:
+    def _get_ips_for_objects(self, object_ids: List[int], id_filter: str, parent_key: str) -> Dict[int, List[Dict]]:
+        """
+        Fetch the IP addresses of many objects using batched id-filtered requests
+        
+        Args:
+            object_ids: Device or virtual machine IDs
+            id_filter: IP address filter taking the object IDs (e.g., device_id)
+            parent_key: Key of the object in the assigned interface (e.g., device)
+            
+        Returns:
+            Dictionary mapping each object ID to a list of IP address dictionaries
+        """
+        object_ids = list(dict.fromkeys(object_ids))
+        ips = {object_id: [] for object_id in object_ids}
+        
+        for start in range(0, len(object_ids), self.IP_BATCH_SIZE):
+            batch = object_ids[start:start + self.IP_BATCH_SIZE]
+            for ip_info in self._paginate(self.IP_ADDRESSES_ENDPOINT, {id_filter: batch}):
+                parent = (ip_info.get('assigned_object') or {}).get(parent_key) or {}
+                object_id = parent.get('id')
+                if object_id in ips:
+                    ips[object_id].append(ip_info)
+        
+        return ips
+    
+    def get_ips_for_vms(self, vm_ids: List[int]) -> Dict[int, List[Dict]]:
+        """
+        Fetch IP addresses for many virtual machines using batched requests
+        
+        Args:
+            vm_ids: Virtual machine IDs
+            
+        Returns:
+            Dictionary mapping each virtual machine ID to a list of IP address dictionaries
+        """
+        return self._get_ips_for_objects(vm_ids, 'virtual_machine_id', 'virtual_machine')
+    
+    def get_ips_for_devices(self, device_ids: List[int]) -> Dict[int, List[Dict]]:
+        """
+        Fetch IP addresses for many devices using batched requests
+        
+        Args:
+            device_ids: Device IDs
+            
+        Returns:
+            Dictionary mapping each device ID to a list of IP address dictionaries
+        """
+        return self._get_ips_for_objects(device_ids, 'device_id', 'device')
+    
+    def get_all_vm_interfaces(self, limit=1000, **params) -> list:
         """
         Fetch all VM interfaces from Netbox, including their IP addresses and associated VM IDs.
         Args:
             limit: Number of results per page (default 1000)
+            **params: Query parameters
         Returns:
             List of interface dicts
         """
-        interfaces = []
-        offset = 0
-        while True:
-            params = {'limit': limit, 'offset': offset}
-            response = self.get('/api/virtualization/interfaces/', params=params)
-            if response and 'results' in response:
-                interfaces.extend(response['results'])
-                if response.get('next'):
-                    offset += limit
-                else:
-                    break
-            else:
-                break
-        return interfaces
+        return self._paginate(self.VM_INTERFACES_ENDPOINT, params, limit=limit)
     
-    def get_all_device_interfaces(self, limit=1000) -> list:
+    def get_all_device_interfaces(self, limit=1000, **params) -> list:
         """
         Fetch all device interfaces from Netbox, including their IP addresses and associated device IDs.
         Args:
             limit: Number of results per page (default 1000)
+            **params: Query parameters
         Returns:
             List of interface dicts
         """
-        interfaces = []
-        offset = 0
-        while True:
-            params = {'limit': limit, 'offset': offset}
-            response = self.get('/api/dcim/interfaces/', params=params)
-            if response and 'results' in response:
-                interfaces.extend(response['results'])
-                if response.get('next'):
-                    offset += limit
-                else:
-                    break
-            else:
-                break
-        return interfaces 
\ No newline at end of file
+        return self._paginate(self.DEVICE_INTERFACES_ENDPOINT, params, limit=limit) 
\ No newline at end of file
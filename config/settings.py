@@ -4,14 +4,43 @@ Configuration Settings
 Load and manage configuration from config.json and environment variables.
 """
 
+import math
 import os
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from utils.helpers import json_dumps, json_loads
+
+
+def _env_bool(value: str) -> bool:
+    """Convert an environment variable value to bool"""
+    return value.lower() == 'true'
 
 
 class Settings:
     """Configuration settings manager"""
     
+    # Default number of concurrent requests per API client
+    DEFAULT_MAX_WORKERS = 16
+    
+    # Environment variable overrides: (variable, section, key, converter)
+    _ENV_OVERRIDES = (
+        # Nessus settings
+        ('NESSUS_URL', 'nessus', 'base_url', str),
+        ('NESSUS_ACCESS_KEY', 'nessus', 'access_key', str),
+        ('NESSUS_SECRET_KEY', 'nessus', 'secret_key', str),
+        ('NESSUS_VERIFY_SSL', 'nessus', 'verify_ssl', _env_bool),
+        ('NESSUS_MAX_WORKERS', 'nessus', 'max_workers', int),
+        ('NESSUS_RATE_RPS', 'nessus', 'rate_rps', float),
+        # Netbox settings
+        ('NETBOX_URL', 'netbox', 'base_url', str),
+        ('NETBOX_TOKEN', 'netbox', 'token', str),
+        ('NETBOX_VERIFY_SSL', 'netbox', 'verify_ssl', _env_bool),
+        ('NETBOX_MAX_WORKERS', 'netbox', 'max_workers', int),
+        ('NETBOX_RATE_RPS', 'netbox', 'rate_rps', float),
+        # Output settings
+        ('OUTPUT_FILE', 'output', 'file', str),
+    )
+    
     def __init__(self, config_file: str = 'config/config.json'):
         """
         Initialize settings
@@ -20,7 +49,14 @@ class Settings:
             config_file: Path to configuration file
         """
         self.config_file = config_file
-        self.config = self._load_config()
+        self._config = None
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Configuration dictionary, loaded on first access"""
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file and environment variables"""
@@ -30,12 +66,16 @@ class Settings:
                 'base_url': 'https://localhost:8834',
                 'access_key': '',
                 'secret_key': '',
-                'verify_ssl': False
+                'verify_ssl': False,
+                'rate_rps': 0,
+                'max_workers': self.DEFAULT_MAX_WORKERS
             },
             'netbox': {
                 'base_url': 'https://localhost',
                 'token': '',
-                'verify_ssl': False
+                'verify_ssl': False,
+                'rate_rps': 0,
+                'max_workers': self.DEFAULT_MAX_WORKERS
             },
             'output': {
                 'file': 'nessus_agents.json',
@@ -48,44 +88,99 @@ class Settings:
         }
         
         # Load from config file if exists
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
-                    config.update(file_config)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Could not load {self.config_file}: {e}")
+        try:
+            with open(self.config_file, 'rb') as f:
+                file_config = json_loads(f.read())
+                self._deep_merge(config, file_config)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not load {self.config_file}: {e}")
         
         # Override with environment variables
         config = self._override_with_env(config)
         
+        for section in ('nessus', 'netbox'):
+            config[section]['max_workers'] = self._validate_max_workers(section, config[section].get('max_workers'))
+            config[section]['rate_rps'] = self._validate_rate_rps(section, config[section].get('rate_rps', 0))
+        
         return config
     
+    @staticmethod
+    def _deep_merge(target: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Recursively merge source into target, keeping target keys missing from source
+        
+        Args:
+            target: Dictionary to merge into
+            source: Dictionary with overriding values
+            
+        Returns:
+            The merged target dictionary
+        """
+        for key, value in source.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                Settings._deep_merge(target[key], value)
+            else:
+                target[key] = value
+        return target
+    
     def _override_with_env(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Override configuration with environment variables"""
-        # Nessus settings
-        if os.getenv('NESSUS_URL'):
-            config['nessus']['base_url'] = os.getenv('NESSUS_URL')
-        if os.getenv('NESSUS_ACCESS_KEY'):
-            config['nessus']['access_key'] = os.getenv('NESSUS_ACCESS_KEY')
-        if os.getenv('NESSUS_SECRET_KEY'):
-            config['nessus']['secret_key'] = os.getenv('NESSUS_SECRET_KEY')
-        if os.getenv('NESSUS_VERIFY_SSL'):
-            config['nessus']['verify_ssl'] = os.getenv('NESSUS_VERIFY_SSL').lower() == 'true'
+        environ = os.environ
+        for env_name, section, key, cast in self._ENV_OVERRIDES:
+            value = environ.get(env_name)
+            if value:
+                try:
+                    config[section][key] = cast(value)
+                except ValueError:
+                    print(f"Warning: Ignoring invalid {env_name} value: {value!r}")
         
-        # Netbox settings
-        if os.getenv('NETBOX_URL'):
-            config['netbox']['base_url'] = os.getenv('NETBOX_URL')
-        if os.getenv('NETBOX_TOKEN'):
-            config['netbox']['token'] = os.getenv('NETBOX_TOKEN')
-        if os.getenv('NETBOX_VERIFY_SSL'):
-            config['netbox']['verify_ssl'] = os.getenv('NETBOX_VERIFY_SSL').lower() == 'true'
+        return config
+    
+    def _validate_max_workers(self, section: str, value: Any) -> int:
+        """
+        Validate a max_workers setting
         
-        # Output settings
-        if os.getenv('OUTPUT_FILE'):
-            config['output']['file'] = os.getenv('OUTPUT_FILE')
+        Args:
+            section: Configuration section the value belongs to
+            value: Configured value
+            
+        Returns:
+            The value clamped to at least 1, or DEFAULT_MAX_WORKERS if it is not an integer
+        """
+        if isinstance(value, bool) or not isinstance(value, int):
+            try:
+                value = int(str(value))
+            except ValueError:
+                print(f"Warning: Invalid {section} max_workers {value!r}, using {self.DEFAULT_MAX_WORKERS}")
+                return self.DEFAULT_MAX_WORKERS
+        if value < 1:
+            print(f"Warning: {section} max_workers must be at least 1, using 1")
+            return 1
+        return value
+    
+    def _validate_rate_rps(self, section: str, value: Any) -> float:
+        """
+        Validate a rate_rps setting
         
-        return config
+        Args:
+            section: Configuration section the value belongs to
+            value: Configured value
+            
+        Returns:
+            The value as a float, or 0 (no limit) if it is not a non-negative number
+        """
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            rate = float(value)
+        except (TypeError, ValueError):
+            rate = None
+        if rate is None or not math.isfinite(rate) or rate < 0:
+            print(f"Warning: Invalid {section} rate_rps {value!r}, request rate limiting is disabled")
+            return 0
+        return rate
     
     def get_nessus_config(self) -> Dict[str, Any]:
         """Get Nessus configuration"""
@@ -103,32 +198,47 @@ class Settings:
         """Get logging configuration"""
         return self.config.get('logging', {})
     
+    def load_nessus_config(self) -> Optional[Dict[str, Any]]:
+        """Get Nessus configuration, or None if it is invalid"""
+        nessus_config = self.get_nessus_config()
+        if (nessus_config.get('base_url') and
+                nessus_config.get('access_key') and
+                nessus_config.get('secret_key')):
+            return nessus_config
+        return None
+    
+    def load_netbox_config(self) -> Optional[Dict[str, Any]]:
+        """Get Netbox configuration, or None if it is invalid"""
+        netbox_config = self.get_netbox_config()
+        if netbox_config.get('base_url') and netbox_config.get('token'):
+            return netbox_config
+        return None
+    
     def validate_nessus_config(self) -> bool:
         """Validate Nessus configuration"""
-        nessus_config = self.get_nessus_config()
-        return bool(
-            nessus_config.get('base_url') and
-            nessus_config.get('access_key') and
-            nessus_config.get('secret_key')
-        )
+        return self.load_nessus_config() is not None
     
     def validate_netbox_config(self) -> bool:
         """Validate Netbox configuration"""
-        netbox_config = self.get_netbox_config()
-        return bool(
-            netbox_config.get('base_url') and
-            netbox_config.get('token')
-        )
+        return self.load_netbox_config() is not None
     
     def save_config(self) -> bool:
         """Save current configuration to file"""
+        # Write to a temporary file and rename it over the config file so an
+        # interrupted save never leaves a truncated config behind
+        temp_file = self.config_file + '.tmp'
         try:
             os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            with open(temp_file, 'wb') as f:
+                f.write(json_dumps(self.config, indent=True))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.config_file)
             return True
         except IOError as e:
             print(f"Error saving configuration: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
             return False
 
 
@@ -9,6 +9,11 @@ network infrastructure management system.
 import sys
 import os
 import json
+import atexit
+import logging
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 from datetime import datetime
 
@@ -21,7 +26,55 @@ from api.netbox_client import NetboxClient
 from services.nessus_service import NessusService
 from services.netbox_service import NetboxService
 from services.comparison_service import ComparisonService
-from utils.helpers import save_to_json, create_output_data, format_timestamp, create_output_data_dict
+from utils.helpers import save_to_json, save_records_to_json, format_timestamp, create_output_data_dict
+
+
+# Main menu, written in a single call before each choice
+MENU_PROMPT = (
+    "\n" + "=" * 40 + "\n"
+    "Available Operations:\n"
+    "1. Fetch Nessus Agents\n"
+    "2. Fetch Netbox Devices\n"
+    "3. Fetch Netbox Virtual Machines\n"
+    "4. Compare Nessus with Netbox\n"
+    "5. Search by IP Address\n"
+    "6. Sync Nessus Agents to Netbox\n"
+    "7. Exit\n"
+    "\nSelect operation (1-7): "
+)
+
+
+def setup_logging():
+    """Configure logging from settings through a background queue listener"""
+    logging_config = settings.get_logging_config()
+    level = getattr(logging, str(logging_config.get('level', 'INFO')).upper(), logging.INFO)
+    formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    handlers = []
+    log_file = logging_config.get('file')
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    
+    # Warnings and errors are also shown on the console
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.WARNING)
+    console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    handlers.append(console_handler)
+    
+    # Worker threads only enqueue records; formatting and I/O happen in the listener thread
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
 
 def initialize_clients():
@@ -29,25 +82,29 @@ def initialize_clients():
     clients = {}
     
     # Initialize Nessus client
-    if settings.validate_nessus_config():
-        nessus_config = settings.get_nessus_config()
+    nessus_config = settings.load_nessus_config()
+    if nessus_config is not None:
         clients['nessus'] = NessusClient(
             base_url=nessus_config['base_url'],
             access_key=nessus_config['access_key'],
             secret_key=nessus_config['secret_key'],
-            verify_ssl=nessus_config['verify_ssl']
+            verify_ssl=nessus_config['verify_ssl'],
+            rate_rps=nessus_config.get('rate_rps', 0),
+            max_workers=nessus_config.get('max_workers', 16)
         )
         print("✓ Nessus client initialized")
     else:
         print("✗ Nessus configuration is invalid")
     
     # Initialize Netbox client
-    if settings.validate_netbox_config():
-        netbox_config = settings.get_netbox_config()
+    netbox_config = settings.load_netbox_config()
+    if netbox_config is not None:
         clients['netbox'] = NetboxClient(
             base_url=netbox_config['base_url'],
             token=netbox_config['token'],
-            verify_ssl=netbox_config['verify_ssl']
+            verify_ssl=netbox_config['verify_ssl'],
+            rate_rps=netbox_config.get('rate_rps', 0),
+            max_workers=netbox_config.get('max_workers', 16)
         )
         print("✓ Netbox client initialized")
     else:
@@ -56,6 +113,12 @@ def initialize_clients():
     return clients
 
 
+def close_clients(clients: Dict):
+    """Close API client sessions and their pooled connections"""
+    for client in clients.values():
+        client.close()
+
+
 def initialize_services(clients: Dict):
     """Initialize service layers"""
     services = {}
@@ -80,18 +143,25 @@ def test_connections(services: Dict):
     """Test connections to all services"""
     print("\nTesting connections...")
     
-    for service_name, service in services.items():
-        print(f"Testing {service_name} connection...")
-        if service.test_connection():
-            print(f"✓ {service_name} connection successful")
-        else:
-            print(f"✗ {service_name} connection failed")
-            return False
+    # Connection tests are independent round trips, so run them together
+    with ThreadPoolExecutor(max_workers=len(services)) as executor:
+        futures = {
+            service_name: executor.submit(service.test_connection)
+            for service_name, service in services.items()
+        }
+        
+        all_ok = True
+        for service_name, future in futures.items():
+            if future.result():
+                print(f"✓ {service_name} connection successful")
+            else:
+                print(f"✗ {service_name} connection failed")
+                all_ok = False
     
-    return True
+    return all_ok
 
 
-def fetch_nessus_agents(nessus_service: NessusService) -> List[Dict]:
+def fetch_nessus_agents(nessus_service: NessusService, output_config: Dict) -> List[Dict]:
     """Fetch agents from Nessus"""
     print("\n=== Fetching Nessus Agents ===")
     
@@ -106,7 +176,6 @@ def fetch_nessus_agents(nessus_service: NessusService) -> List[Dict]:
         print(f"  By Platform: {stats['by_platform']}")
         
         # Save to file
-        output_config = settings.get_output_config()
         filename = output_config.get('file', 'nessus_agents.json')
         if nessus_service.save_agents_to_file(agents, filename):
             print(f"✓ Agents saved to {filename}")
@@ -118,7 +187,7 @@ def fetch_nessus_agents(nessus_service: NessusService) -> List[Dict]:
     return agents
 
 
-def fetch_netbox_devices(netbox_service: NetboxService) -> List[Dict]:
+def fetch_netbox_devices(netbox_service: NetboxService, output_config: Dict) -> List[Dict]:
     """Fetch devices from Netbox"""
     print("\n=== Fetching Netbox Devices ===")
     
@@ -133,7 +202,6 @@ def fetch_netbox_devices(netbox_service: NetboxService) -> List[Dict]:
         print(f"  By Site: {stats['by_site']}")
         
         # Save to file
-        output_config = settings.get_output_config()
         filename = output_config.get('file', 'netbox_devices.json')
         if netbox_service.save_devices_to_file(devices, filename):
             print(f"✓ Devices saved to {filename}")
@@ -145,7 +213,7 @@ def fetch_netbox_devices(netbox_service: NetboxService) -> List[Dict]:
     return devices
 
 
-def fetch_netbox_vms(netbox_service: NetboxService) -> List[Dict]:
+def fetch_netbox_vms(netbox_service: NetboxService, output_config: Dict) -> List[Dict]:
     """Fetch virtual machines from Netbox"""
     print("\n=== Fetching Netbox Virtual Machines ===")
     
@@ -161,7 +229,6 @@ def fetch_netbox_vms(netbox_service: NetboxService) -> List[Dict]:
         print(f"  By Cluster: {stats['by_cluster']}")
         
         # Save to file
-        output_config = settings.get_output_config()
         filename = output_config.get('file', 'netbox_vms.json')
         if netbox_service.save_vms_to_file(vms, filename):
             print(f"✓ Virtual machines saved to {filename}")
@@ -177,8 +244,8 @@ def sync_nessus_to_netbox(nessus_service: NessusService, netbox_service: NetboxS
     """Sync Nessus agents to Netbox devices"""
     print("\n=== Syncing Nessus Agents to Netbox ===")
     
-    # Fetch agents from Nessus
-    agents = nessus_service.fetch_all_agents(include_details=True)
+    # Fetch agents from Nessus, reusing a recent fetch
+    agents = nessus_service.fetch_all_agents(include_details=True, use_cache=True)
     
     if not agents:
         print("No agents found in Nessus")
@@ -190,86 +257,100 @@ def sync_nessus_to_netbox(nessus_service: NessusService, netbox_service: NetboxS
     print(f"✓ Synced {len(synced_devices)} devices to Netbox")
     
     # Save sync results
-    sync_data = create_output_data(synced_devices, "synced_devices")
-    save_to_json(sync_data, "output/sync_results.json")
+    save_records_to_json(synced_devices, "output/sync_results.json", "synced_devices")
 
 
-def compare_nessus_with_netbox(comparison_service: ComparisonService):
-    """Compare Nessus agents with Netbox devices and VMs"""
-    print("\n=== Nessus-Netbox Comparison ===")
-    print("1. Individual comparisons (separate device and VM comparisons)")
-    print("2. Comprehensive comparison (smart matching with priority)")
-    
-    sub_choice = input("Select comparison type (1-2): ").strip()
-    
-    if sub_choice == '1':
+def compare_individually(comparison_service: ComparisonService):
+    """Compare Nessus agents separately with Netbox devices and VMs"""
+    # Results are saved in the background while the next comparison runs
+    with ThreadPoolExecutor(max_workers=2) as executor:
         # Compare with devices
         print("\n1. Comparing with Netbox Devices...")
         device_comparison = comparison_service.compare_agents_with_devices()
         comparison_service.print_comparison_summary(device_comparison, "devices")
-        
-        # Save device comparison results
-        if comparison_service.save_comparison_results(device_comparison, "output/device_comparison.json"):
-            print("✓ Device comparison saved to output/device_comparison.json")
+        device_saved = executor.submit(
+            comparison_service.save_comparison_results, device_comparison, "output/device_comparison.json"
+        )
         
         # Compare with virtual machines
         print("\n2. Comparing with Netbox Virtual Machines...")
         vm_comparison = comparison_service.compare_agents_with_vms()
         comparison_service.print_comparison_summary(vm_comparison, "vms")
+        vm_saved = executor.submit(
+            comparison_service.save_comparison_results, vm_comparison, "output/vm_comparison.json"
+        )
         
-        # Save VM comparison results
-        if comparison_service.save_comparison_results(vm_comparison, "output/vm_comparison.json"):
+        if device_saved.result():
+            print("✓ Device comparison saved to output/device_comparison.json")
+        if vm_saved.result():
             print("✓ VM comparison saved to output/vm_comparison.json")
-        
-        # Generate combined summary
-        print("\n=== Combined Summary ===")
-        total_agents = device_comparison['summary']['total_agents']
-        total_devices = device_comparison['summary']['total_devices']
-        total_vms = vm_comparison['summary']['total_vms']
-        total_matched = device_comparison['summary']['matched'] + vm_comparison['summary']['matched']
-        
-        print(f"Total Nessus Agents: {total_agents}")
-        print(f"Total Netbox Devices: {total_devices}")
-        print(f"Total Netbox VMs: {total_vms}")
-        print(f"Total Matched Items: {total_matched}")
-        
-        if total_agents > 0:
-            overall_coverage = (total_matched / total_agents) * 100
-            print(f"Overall Coverage: {overall_coverage:.1f}%")
-    
-    elif sub_choice == '2':
-        # Comprehensive comparison
-        print("\n=== Comprehensive Comparison ===")
-        comprehensive = comparison_service.comprehensive_comparison()
-        
-        # Print comprehensive summary
-        print("\n=== Comprehensive Comparison Summary ===")
-        summary = comprehensive['summary']
-        print(f"Total Nessus Agents: {summary['total_agents']}")
-        print(f"Total Netbox Devices: {summary['total_devices']}")
-        print(f"Total Netbox VMs: {summary['total_vms']}")
-        print(f"Matched with Devices: {summary['matched_with_devices']}")
-        print(f"Matched with VMs: {summary['matched_with_vms']}")
-        print(f"Unmatched Agents: {summary['unmatched_agents']}")
-        print(f"Unmatched Devices: {summary['unmatched_devices']}")
-        print(f"Unmatched VMs: {summary['unmatched_vms']}")
-        
-        # Print match type analysis
-        details = comprehensive['details']
-        print(f"\nMatch Type Analysis:")
-        print(f"  Hostname Matches: {details['match_type_analysis']['hostname_matches']}")
-        print(f"  IP Matches: {details['match_type_analysis']['ip_matches']}")
-        
-        # Print coverage analysis
-        coverage = details['coverage_analysis']
-        print(f"\nCoverage Analysis:")
-        print(f"  Total Netbox Items: {coverage['total_netbox_items']}")
-        print(f"  Total Matched: {coverage['total_matched']}")
-        print(f"  Coverage Percentage: {coverage['coverage_percentage']}%")
-        print(f"  Unmatched Netbox Items: {coverage['unmatched_netbox_items']}")
-        
-        print("✓ Comprehensive comparison saved to output/comprehensive_comparison_results.json")
     
+    # Generate combined summary
+    print("\n=== Combined Summary ===")
+    total_agents = device_comparison['summary']['total_agents']
+    total_devices = device_comparison['summary']['total_devices']
+    total_vms = vm_comparison['summary']['total_vms']
+    total_matched = device_comparison['summary']['matched'] + vm_comparison['summary']['matched']
+    
+    print(f"Total Nessus Agents: {total_agents}")
+    print(f"Total Netbox Devices: {total_devices}")
+    print(f"Total Netbox VMs: {total_vms}")
+    print(f"Total Matched Items: {total_matched}")
+    
+    if total_agents > 0:
+        overall_coverage = (total_matched / total_agents) * 100
+        print(f"Overall Coverage: {overall_coverage:.1f}%")
+
+
+def compare_comprehensively(comparison_service: ComparisonService):
+    """Compare Nessus agents with Netbox devices and VMs using smart matching"""
+    print("\n=== Comprehensive Comparison ===")
+    comprehensive = comparison_service.comprehensive_comparison()
+    
+    # Print comprehensive summary
+    print("\n=== Comprehensive Comparison Summary ===")
+    summary = comprehensive['summary']
+    print(f"Total Nessus Agents: {summary['total_agents']}")
+    print(f"Total Netbox Devices: {summary['total_devices']}")
+    print(f"Total Netbox VMs: {summary['total_vms']}")
+    print(f"Matched with Devices: {summary['matched_with_devices']}")
+    print(f"Matched with VMs: {summary['matched_with_vms']}")
+    print(f"Unmatched Agents: {summary['unmatched_agents']}")
+    print(f"Unmatched Devices: {summary['unmatched_devices']}")
+    print(f"Unmatched VMs: {summary['unmatched_vms']}")
+    
+    # Print match type analysis
+    details = comprehensive['details']
+    print(f"\nMatch Type Analysis:")
+    print(f"  Hostname Matches: {details['match_type_analysis']['hostname_matches']}")
+    print(f"  IP Matches: {details['match_type_analysis']['ip_matches']}")
+    
+    # Print coverage analysis
+    coverage = details['coverage_analysis']
+    print(f"\nCoverage Analysis:")
+    print(f"  Total Netbox Items: {coverage['total_netbox_items']}")
+    print(f"  Total Matched: {coverage['total_matched']}")
+    print(f"  Coverage Percentage: {coverage['coverage_percentage']}%")
+    print(f"  Unmatched Netbox Items: {coverage['unmatched_netbox_items']}")
+    
+    print("✓ Comprehensive comparison saved to output/comprehensive_comparison_results.json")
+
+
+def compare_nessus_with_netbox(comparison_service: ComparisonService):
+    """Compare Nessus agents with Netbox devices and VMs"""
+    print("\n=== Nessus-Netbox Comparison ===")
+    print("1. Individual comparisons (separate device and VM comparisons)")
+    print("2. Comprehensive comparison (smart matching with priority)")
+    
+    comparisons = {
+        '1': compare_individually,
+        '2': compare_comprehensively
+    }
+    
+    sub_choice = input("Select comparison type (1-2): ").strip()
+    compare = comparisons.get(sub_choice)
+    if compare:
+        compare(comparison_service)
     else:
         print("Invalid choice. Please select 1 or 2.")
 
@@ -280,11 +361,12 @@ def search_by_ip_address(nessus_service: NessusService, netbox_service: NetboxSe
     ip_address = input("Enter IP address to search: ").strip()
     
     if ip_address:
-        # Search in Nessus
-        nessus_results = nessus_service.search_agents_by_ip(ip_address)
-        
-        # Search in Netbox
-        netbox_results = netbox_service.search_all_by_ip(ip_address)
+        # Search Nessus and Netbox at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            nessus_future = executor.submit(nessus_service.search_agents_by_ip, ip_address)
+            netbox_future = executor.submit(netbox_service.search_all_by_ip, ip_address)
+            nessus_results = nessus_future.result()
+            netbox_results = netbox_future.result()
         
         # Combine results
         search_results = {
@@ -306,18 +388,24 @@ def search_by_ip_address(nessus_service: NessusService, netbox_service: NetboxSe
         
         if nessus_results:
             print(f"\nNessus Agents ({len(nessus_results)}):")
-            for agent in nessus_results:
-                print(f"  - {agent.get('name', 'Unknown')} ({agent.get('status', 'Unknown')})")
+            print("\n".join(
+                f"  - {agent.get('name', 'Unknown')} ({agent.get('status', 'Unknown')})"
+                for agent in nessus_results
+            ))
         
         if netbox_results.get('devices'):
             print(f"\nNetbox Devices ({len(netbox_results['devices'])}):")
-            for device in netbox_results['devices']:
-                print(f"  - {device.get('name', 'Unknown')} ({device.get('status', {}).get('value', 'Unknown')})")
+            print("\n".join(
+                f"  - {device.get('name', 'Unknown')} ({device.get('status', {}).get('value', 'Unknown')})"
+                for device in netbox_results['devices']
+            ))
         
         if netbox_results.get('vms'):
             print(f"\nNetbox VMs ({len(netbox_results['vms'])}):")
-            for vm in netbox_results['vms']:
-                print(f"  - {vm.get('name', 'Unknown')} ({vm.get('status', {}).get('value', 'Unknown')})")
+            print("\n".join(
+                f"  - {vm.get('name', 'Unknown')} ({vm.get('status', {}).get('value', 'Unknown')})"
+                for vm in netbox_results['vms']
+            ))
         
         if not search_results['total_found']:
             print("No items found with this IP address.")
@@ -330,6 +418,8 @@ def main():
     print("Netbox-Nessus Integration Tool")
     print("=" * 40)
     
+    setup_logging()
+    
     # Initialize clients
     print("Initializing clients...")
     clients = initialize_clients()
@@ -338,6 +428,9 @@ def main():
         print("No valid clients could be initialized. Please check your configuration.")
         sys.exit(1)
     
+    # Release pooled connections on every exit path
+    atexit.register(close_clients, clients)
+    
     # Initialize services
     print("Initializing services...")
     services = initialize_services(clients)
@@ -351,63 +444,44 @@ def main():
         print("Connection test failed. Please check your configuration.")
         sys.exit(1)
     
+    # Settings do not change while the menu runs
+    output_config = settings.get_output_config()
+    
+    # Menu choice -> (required services, handler, message when unavailable)
+    menu_actions = {
+        '1': (('nessus',), lambda: fetch_nessus_agents(services['nessus'], output_config),
+              "Nessus service not available"),
+        '2': (('netbox',), lambda: fetch_netbox_devices(services['netbox'], output_config),
+              "Netbox service not available"),
+        '3': (('netbox',), lambda: fetch_netbox_vms(services['netbox'], output_config),
+              "Netbox service not available"),
+        '4': (('comparison',), lambda: compare_nessus_with_netbox(services['comparison']),
+              "Both Nessus and Netbox services are required for comparison"),
+        '5': (('nessus', 'netbox'), lambda: search_by_ip_address(services['nessus'], services['netbox']),
+              "Both Nessus and Netbox services are required for IP search"),
+        '6': (('nessus', 'netbox'), lambda: sync_nessus_to_netbox(services['nessus'], services['netbox']),
+              "Both Nessus and Netbox services are required for sync")
+    }
+    
     # Main menu
     while True:
-        print("\n" + "=" * 40)
-        print("Available Operations:")
-        print("1. Fetch Nessus Agents")
-        print("2. Fetch Netbox Devices")
-        print("3. Fetch Netbox Virtual Machines")
-        print("4. Compare Nessus with Netbox")
-        print("5. Search by IP Address")
-        print("6. Sync Nessus Agents to Netbox")
-        print("7. Exit")
+        choice = input(MENU_PROMPT).strip()
+        
+        if choice == '7':
+            print("Exiting...")
+            break
         
-        choice = input("\nSelect operation (1-7): ").strip()
+        action = menu_actions.get(choice)
+        if action is None:
+            print("Invalid choice. Please select 1-7.")
+            continue
         
+        required, handler, unavailable_message = action
         try:
-            if choice == '1':
-                if 'nessus' in services:
-                    fetch_nessus_agents(services['nessus'])
-                else:
-                    print("Nessus service not available")
-            
-            elif choice == '2':
-                if 'netbox' in services:
-                    fetch_netbox_devices(services['netbox'])
-                else:
-                    print("Netbox service not available")
-            
-            elif choice == '3':
-                if 'netbox' in services:
-                    fetch_netbox_vms(services['netbox'])
-                else:
-                    print("Netbox service not available")
-            
-            elif choice == '4':
-                if 'comparison' in services:
-                    compare_nessus_with_netbox(services['comparison'])
-                else:
-                    print("Both Nessus and Netbox services are required for comparison")
-            
-            elif choice == '5':
-                if 'nessus' in services and 'netbox' in services:
-                    search_by_ip_address(services['nessus'], services['netbox'])
-                else:
-                    print("Both Nessus and Netbox services are required for IP search")
-            
-            elif choice == '6':
-                if 'nessus' in services and 'netbox' in services:
-                    sync_nessus_to_netbox(services['nessus'], services['netbox'])
-                else:
-                    print("Both Nessus and Netbox services are required for sync")
-            
-            elif choice == '7':
-                print("Exiting...")
-                break
-            
+            if all(name in services for name in required):
+                handler()
             else:
-                print("Invalid choice. Please select 1-7.")
+                print(unavailable_message)
         
         except KeyboardInterrupt:
             print("\nOperation cancelled by user")
@@ -415,32 +489,8 @@ def main():
             print(f"Error during operation: {e}")
     
     # Cleanup
-    for client in clients.values():
-        client.close()
-
-    # Restore previous config loading logic
-    NB_URL = os.environ.get('NETBOX_URL') or 'http://10.19.51.32'
-    NB_TOKEN = os.environ.get('NETBOX_TOKEN') or 'YOUR_TOKEN_HERE'
-    # Use these variables to initialize NetboxClient and services as before
+    close_clients(clients)
 
 
 if __name__ == "__main__":
-    main()
-    # DEBUG: Fetch and print all VM interfaces with their IPs
-    from api.netbox_client import NetboxClient
-    import os
-    NB_URL = os.environ.get('NETBOX_URL') or 'http://10.19.51.32'
-    NB_TOKEN = os.environ.get('NETBOX_TOKEN') or 'YOUR_TOKEN_HERE'
-    client = NetboxClient(NB_URL, NB_TOKEN, verify_ssl=False)
-    interfaces = client.get_all_vm_interfaces()
-    print(f"Total VM interfaces: {len(interfaces)}")
-    for iface in interfaces[:10]:
-        print({
-            'name': iface.get('name'),
-            'virtual_machine': iface.get('virtual_machine'),
-            'ip_addresses': iface.get('ip_addresses')
-        })
-
-    # Use these variables to initialize clients/services
-    # Remove all get_config_value lines and config_path/section logic
-    # ... existing code ... 
\ No newline at end of file
+    main() 
\ No newline at end of file
@@ -4,16 +4,50 @@ Comparison Service
 Service for comparing Nessus agents with Netbox devices and virtual machines.
 """
 
-import json
+import functools
 import os
-from typing import Dict, List, Optional, Tuple
+import sys
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Collection, Dict, List, Optional, Tuple
 from services.nessus_service import NessusService
 from services.netbox_service import NetboxService
-from utils.helpers import save_to_json, create_output_data, create_output_data_dict
+from utils.helpers import json_loads, save_dict_to_json, create_output_data
 from utils.html_reporter import HTMLReporter
 from tqdm import tqdm
 
 
+# Unbounded: names are bounded by the inventory, and an LRU smaller than a large
+# catalog evicts on every lookup of a full pass
+@functools.lru_cache(maxsize=None)
+def _normalize_hostname(name: str) -> str:
+    """Hostname part of a name (before the first dot), lowercased, interned and memoized"""
+    return sys.intern(name.partition('.')[0].lower())
+
+
+# Loops over fewer items than this finish too fast for a progress bar to be useful
+PROGRESS_MIN_ITEMS = 200
+
+
+def _progress(items: Collection, desc: str) -> tqdm:
+    """
+    Wrap items in a progress bar that redraws about 100 times in total
+    
+    Args:
+        items: Items to iterate over
+        desc: Progress bar description
+        
+    Returns:
+        tqdm iterator, disabled for small collections
+    """
+    return tqdm(items, desc=desc, mininterval=0.5, miniters=max(1, len(items) // 100),
+                disable=len(items) < PROGRESS_MIN_ITEMS)
+
+
+# Fields of a Netbox device or VM used in comparison results, extracted once per item
+NetboxRecord = namedtuple('NetboxRecord', 'status site platform device_type cluster primary_ip')
+
+
 class ComparisonService:
     """Service for comparing data between Nessus and Netbox"""
     
@@ -28,6 +62,21 @@ class ComparisonService:
         self.nessus_service = nessus_service
         self.netbox_service = netbox_service
         self.html_reporter = HTMLReporter()
+        
+        # Parsed cache files keyed by path: ((mtime, size), items)
+        self._cached_files: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+        
+        # Lookups built from item lists keyed by id(items): (items, lookups)
+        self._lookup_cache: Dict[int, Tuple[List[Dict], Tuple[Dict[str, Dict], Dict[str, Dict]]]] = {}
+        
+        # Extracted Netbox fields keyed by id(item): (item, record)
+        self._record_cache: Dict[int, Tuple[Dict, NetboxRecord]] = {}
+        
+        # All IPs of Netbox items keyed by id(item): (item, ips)
+        self._ips_cache: Dict[int, Tuple[Dict, List[str]]] = {}
+        
+        # Interface-less items' IP address dictionaries fetched in bulk, keyed by id(item): (item, ips)
+        self._fallback_ips: Dict[int, Tuple[Dict, List[Dict]]] = {}
     
     def _extract_hostname(self, name: str) -> str:
         """
@@ -41,8 +90,7 @@ class ComparisonService:
         """
         if not name:
             return ""
-        # Split by dot and take the first part, then lowercase
-        return name.split('.')[0].lower()
+        return _normalize_hostname(name)
     
     def _get_primary_ip(self, item: Dict) -> Optional[str]:
         """
@@ -57,14 +105,213 @@ class ComparisonService:
         # Try different possible IP fields
         primary_ip = item.get('primary_ip')
         if primary_ip and isinstance(primary_ip, dict):
-            return primary_ip.get('address', '').split('/')[0]  # Remove CIDR notation
+            return primary_ip.get('address', '').partition('/')[0]  # Remove CIDR notation
         
         primary_ip4 = item.get('primary_ip4')
         if primary_ip4 and isinstance(primary_ip4, dict):
-            return primary_ip4.get('address', '').split('/')[0]
+            return primary_ip4.get('address', '').partition('/')[0]
         
         return None
     
+    def _get_lookups(self, items: List[Dict]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """
+        Get hostname and primary IP lookups, reusing them while the same list is compared again
+        
+        Cached input files are returned as the same list object while the file is
+        unchanged, so repeated comparisons skip the normalization work.
+        
+        Args:
+            items: Agent, device or VM dictionaries
+            
+        Returns:
+            Tuple of (hostname -> item, primary IP -> item) dictionaries
+        """
+        key = id(items)
+        cached = self._lookup_cache.get(key)
+        if cached and cached[0] is items:
+            return cached[1]
+        
+        # Lists fetched from the API are new objects each time; keep the caches small
+        if len(self._lookup_cache) >= 16:
+            self._lookup_cache.clear()
+            self._record_cache.clear()
+            self._ips_cache.clear()
+            self._fallback_ips.clear()
+        lookups = self._build_lookups(items)
+        self._lookup_cache[key] = (items, lookups)
+        return lookups
+    
+    def _build_lookups(self, items: List[Dict]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """
+        Build hostname and primary IP lookups in a single pass over items
+        
+        Args:
+            items: Agent, device or VM dictionaries, as returned by the _get_*_data loaders
+            
+        Returns:
+            Tuple of (hostname -> item, primary IP -> item) dictionaries
+        """
+        by_hostname = {}
+        by_ip = {}
+        for item in items:
+            if not item:
+                continue
+            name = item.get('name')
+            if name:
+                by_hostname[self._extract_hostname(name)] = item
+            ip = self._get_primary_ip(item)
+            if ip:
+                by_ip[ip] = item
+        return by_hostname, by_ip
+    
+    def _netbox_record(self, item: Dict) -> NetboxRecord:
+        """
+        Extract the nested Netbox fields used in comparison results
+        
+        Records are memoized per item, so a device or VM is only flattened
+        once while its list is compared again (e.g. per type and comprehensively).
+        
+        Args:
+            item: Netbox device or VM dictionary
+            
+        Returns:
+            NetboxRecord with None for missing fields
+        """
+        key = id(item)
+        cached = self._record_cache.get(key)
+        if cached and cached[0] is item:
+            return cached[1]
+        
+        status = item.get('status')
+        site = item.get('site')
+        platform = item.get('platform')
+        device_type = item.get('device_type')
+        cluster = item.get('cluster')
+        record = NetboxRecord(
+            status=status.get('value') if status else None,
+            site=site.get('name') if site else None,
+            platform=platform.get('name') if platform else None,
+            device_type=device_type.get('model') if device_type else None,
+            cluster=cluster.get('name') if cluster else None,
+            primary_ip=self._get_primary_ip(item)
+        )
+        self._record_cache[key] = (item, record)
+        return record
+    
+    def _build_match(self, name: str, match_type: str, agent: Dict, item: Dict, kind: str) -> Dict:
+        """
+        Build the details of a matched agent and Netbox device or VM
+        
+        Args:
+            name: Normalized hostname of the agent
+            match_type: How the pair was matched ('hostname' or 'ip')
+            agent: Nessus agent dictionary
+            item: Netbox device or VM dictionary
+            kind: 'device' or 'vm'
+            
+        Returns:
+            Match details dictionary
+        """
+        record = self._netbox_record(item)
+        if kind == 'vm':
+            netbox_key = 'netbox_vm'
+            netbox_details = {
+                'id': item.get('id'),
+                'status': record.status,
+                'cluster': record.cluster,
+                'platform': record.platform,
+                'site': record.site,
+                'vcpus': item.get('vcpus'),
+                'memory': item.get('memory'),
+                'disk': item.get('disk'),
+                'primary_ip': record.primary_ip,
+                'all_ips': self._get_all_ips(item, kind, record.primary_ip)
+            }
+        else:
+            netbox_key = 'netbox_device'
+            netbox_details = {
+                'id': item.get('id'),
+                'status': record.status,
+                'site': record.site,
+                'platform': record.platform,
+                'device_type': record.device_type,
+                'primary_ip': record.primary_ip,
+                'all_ips': self._get_all_ips(item, kind, record.primary_ip)
+            }
+        
+        # Agent fields shared by the agent details and the match flags
+        agent_status = agent.get('status')
+        agent_platform = agent.get('platform')
+        return {
+            'name': name,
+            'match_type': match_type,
+            'nessus_agent': {
+                'id': agent.get('id'),
+                'status': agent_status,
+                'platform': agent_platform,
+                'version': agent.get('version'),
+                'last_connect': agent.get('last_connect'),
+                'ip': agent.get('ip')
+            },
+            netbox_key: netbox_details,
+            'status_match': agent_status == 'online' and record.status == 'active',
+            'platform_match': record.platform is not None and agent_platform == record.platform
+        }
+    
+    def _build_unmatched_agent(self, name: str, agent_id, agent: Dict) -> Dict:
+        """
+        Build the details of an agent without a Netbox match
+        
+        Args:
+            name: Normalized hostname of the agent
+            agent_id: ID of the agent
+            agent: Nessus agent dictionary
+            
+        Returns:
+            Unmatched agent dictionary
+        """
+        return {
+            'name': name,
+            'id': agent_id,
+            'status': agent.get('status'),
+            'platform': agent.get('platform'),
+            'version': agent.get('version'),
+            'ip': agent.get('ip')
+        }
+    
+    def _build_unmatched(self, item: Dict, item_id, kind: str) -> Dict:
+        """
+        Build the details of a Netbox device or VM without an agent match
+        
+        Args:
+            item: Netbox device or VM dictionary
+            item_id: ID of the item
+            kind: 'device' or 'vm'
+            
+        Returns:
+            Unmatched device or VM dictionary
+        """
+        record = self._netbox_record(item)
+        name = self._extract_hostname(item.get('name', ''))
+        if kind == 'vm':
+            return {
+                'name': name,
+                'id': item_id,
+                'status': record.status,
+                'cluster': record.cluster,
+                'platform': record.platform,
+                'site': record.site,
+                'primary_ip': record.primary_ip
+            }
+        return {
+            'name': name,
+            'id': item_id,
+            'status': record.status,
+            'site': record.site,
+            'platform': record.platform,
+            'primary_ip': record.primary_ip
+        }
+    
     def test_connection(self) -> bool:
         """Test connections to both services"""
         try:
@@ -87,25 +334,32 @@ class ComparisonService:
             List of data items or None if file doesn't exist
         """
         try:
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Extract the actual data from the wrapper structure
-                    if isinstance(data, dict) and 'data' in data:
-                        raw_data = data['data']
-                        if isinstance(raw_data, list):
-                            # Filtrele: sadece dict olan ve None olmayan elemanları al
-                            filtered_data = [x for x in raw_data if x is not None and isinstance(x, dict)]
-                            return filtered_data
-                        else:
-                            return None
-                    elif isinstance(data, list):
-                        # Filtrele: sadece dict olan ve None olmayan elemanları al
-                        filtered_data = [x for x in data if x is not None and isinstance(x, dict)]
-                        return filtered_data
-                    else:
-                        return None
+            stat = os.stat(filename)
+        except OSError:
             return None
+        
+        try:
+            # Reuse the parsed items while the file is unchanged
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = self._cached_files.get(filename)
+            if cached and cached[0] == signature:
+                return cached[1]
+            
+            with open(filename, 'rb') as f:
+                data = json_loads(f.read())
+            
+            # Extract the actual data from the wrapper structure
+            if isinstance(data, dict) and 'data' in data:
+                data = data['data']
+            if not isinstance(data, list):
+                return None
+            
+            # Filtrele: sadece dict olan ve None olmayan elemanları al
+            # (the parsed list is kept as-is when it holds nothing else)
+            if not all(isinstance(x, dict) for x in data):
+                data = [x for x in data if isinstance(x, dict)]
+            self._cached_files[filename] = (signature, data)
+            return data
         except Exception as e:
             print(f"Warning: Could not load cached data from {filename}: {e}")
             return None
@@ -125,7 +379,7 @@ class ComparisonService:
         
         # Fall back to fresh API call
         print("No cached agents data found, fetching from Nessus...")
-        agents = self.nessus_service.fetch_all_agents(include_details=True)
+        agents = self.nessus_service.fetch_all_agents(include_details=True, use_cache=True)
         return [x for x in agents if isinstance(x, dict)]
     
     def _get_devices_data(self) -> List[Dict]:
@@ -143,7 +397,7 @@ class ComparisonService:
         
         # Fall back to fresh API call
         print("No cached devices data found, fetching from Netbox...")
-        devices = self.netbox_service.fetch_all_devices()
+        devices = self.netbox_service.fetch_all_devices(use_cache=True)
         return [x for x in devices if isinstance(x, dict)]
     
     def _get_vms_data(self) -> List[Dict]:
@@ -161,9 +415,26 @@ class ComparisonService:
         
         # Fall back to fresh API call
         print("No cached VMs data found, fetching from Netbox...")
-        vms = self.netbox_service.fetch_all_virtual_machines()
+        vms = self.netbox_service.fetch_all_virtual_machines(use_cache=True)
         return [x for x in vms if isinstance(x, dict)]
     
+    def _load_data(self, *loaders: Callable[[], List[Dict]]) -> List[List[Dict]]:
+        """
+        Run data loaders concurrently
+        
+        Cache file reads and API fetches block on I/O, so loading agents, devices
+        and VMs side by side takes about as long as the slowest of them.
+        
+        Args:
+            *loaders: Functions returning a list of items, e.g. _get_agents_data
+            
+        Returns:
+            Results of the loaders in the order given
+        """
+        with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+            futures = [executor.submit(loader) for loader in loaders]
+            return [future.result() for future in futures]
+    
     def compare_agents_with_devices(self) -> Dict:
         """
         Compare Nessus agents with Netbox devices
@@ -174,8 +445,8 @@ class ComparisonService:
         print("=== Comparing Nessus Agents with Netbox Devices ===")
         
         # Get data from cache or API
-        agents = self._get_agents_data()
-        devices = self._get_devices_data()
+        agents, devices = self._load_data(self._get_agents_data, self._get_devices_data)
+        self._prefetch_fallback_ips(devices=devices)
         
         comparison = {
             'summary': {
@@ -191,124 +462,59 @@ class ComparisonService:
             'details': {}
         }
         
-        # Create lookup dictionaries by hostname
-        agent_names = {self._extract_hostname(agent.get('name', '')): agent for agent in agents if agent and isinstance(agent, dict) and agent.get('name')}
-        device_names = {self._extract_hostname(device.get('name', '')): device for device in devices if device and isinstance(device, dict) and device.get('name')}
+        # Create hostname lookup for agents
+        agent_names, _ = self._get_lookups(agents)
         
-        # Create IP-based lookup for devices
-        device_ips = {}
-        for device in devices:
-            if device and isinstance(device, dict):
-                ip = self._get_primary_ip(device)
-                if ip:
-                    device_ips[ip] = device
+        # Create hostname and IP-based lookups for devices
+        device_names, device_ips = self._get_lookups(devices)
         
         # Find matches by hostname first
-        matched_names = set(agent_names.keys()) & set(device_names.keys())
+        matched_names = agent_names.keys() & device_names.keys()
         matched_agents = set()
         matched_devices = set()
+        # Match type, status and platform counts for the details section
+        match_tally = Counter()
         
-        for name in tqdm(matched_names, desc="Matching agents/devices by hostname"):
+        for name in _progress(matched_names, "Matching agents/devices by hostname"):
             agent = agent_names[name]
             device = device_names[name]
             
-            match_details = {
-                'name': name,
-                'match_type': 'hostname',
-                'nessus_agent': {
-                    'id': agent.get('id'),
-                    'status': agent.get('status'),
-                    'platform': agent.get('platform'),
-                    'version': agent.get('version'),
-                    'last_connect': agent.get('last_connect'),
-                    'ip': agent.get('ip')
-                },
-                'netbox_device': {
-                    'id': device.get('id'),
-                    'status': device.get('status', {}).get('value') if device.get('status') else None,
-                    'site': device.get('site', {}).get('name') if device.get('site') else None,
-                    'platform': device.get('platform', {}).get('name') if device.get('platform') else None,
-                    'device_type': device.get('device_type', {}).get('model') if device.get('device_type') else None,
-                    'primary_ip': self._get_primary_ip(device),
-                    'all_ips': self._get_all_ips(device)
-                },
-                'status_match': agent.get('status') == 'online' and device.get('status', {}).get('value') == 'active',
-                'platform_match': agent.get('platform') == device.get('platform', {}).get('name') if device.get('platform') else False
-            }
+            match_details = self._build_match(name, 'hostname', agent, device, 'device')
             
             comparison['matched_items'].append(match_details)
+            self._tally_match(match_tally, match_details)
             comparison['summary']['matched'] += 1
             matched_agents.add(agent.get('id'))
             matched_devices.add(device.get('id'))
         
-        # Find IP-based matches for remaining agents
+        # Match remaining agents by IP, listing agents without any match as unmatched
         for agent in agents:
-            if agent and isinstance(agent, dict) and agent.get('id') not in matched_agents:
-                agent_ip = agent.get('ip')  # Nessus agent IP field
-                if agent_ip and agent_ip in device_ips:
-                    device = device_ips[agent_ip]
-                    if device.get('id') not in matched_devices:  # Device not already matched
-                        name = self._extract_hostname(agent.get('name', ''))
-                        
-                        match_details = {
-                            'name': name,
-                            'match_type': 'ip',
-                            'nessus_agent': {
-                                'id': agent.get('id'),
-                                'status': agent.get('status'),
-                                'platform': agent.get('platform'),
-                                'version': agent.get('version'),
-                                'last_connect': agent.get('last_connect'),
-                                'ip': agent.get('ip')
-                            },
-                            'netbox_device': {
-                                'id': device.get('id'),
-                                'status': device.get('status', {}).get('value') if device.get('status') else None,
-                                'site': device.get('site', {}).get('name') if device.get('site') else None,
-                                'platform': device.get('platform', {}).get('name') if device.get('platform') else None,
-                                'device_type': device.get('device_type', {}).get('model') if device.get('device_type') else None,
-                                'primary_ip': self._get_primary_ip(device),
-                                'all_ips': self._get_all_ips(device)
-                            },
-                            'status_match': agent.get('status') == 'online' and device.get('status', {}).get('value') == 'active',
-                            'platform_match': agent.get('platform') == device.get('platform', {}).get('name') if device.get('platform') else False
-                        }
-                        
-                        comparison['matched_items'].append(match_details)
-                        comparison['summary']['matched'] += 1
-                        matched_agents.add(agent.get('id'))
-                        matched_devices.add(device.get('id'))
-        
-        # Find unmatched agents (not matched by hostname or IP)
-        for agent in agents:
-            if agent and isinstance(agent, dict) and agent.get('id') not in matched_agents:
+            if agent and (agent_id := agent.get('id')) not in matched_agents:
                 name = self._extract_hostname(agent.get('name', ''))
-                comparison['unmatched_agents'].append({
-                    'name': name,
-                    'id': agent.get('id'),
-                    'status': agent.get('status'),
-                    'platform': agent.get('platform'),
-                    'version': agent.get('version'),
-                    'ip': agent.get('ip')
-                })
+                agent_ip = agent.get('ip')  # Nessus agent IP field
+                device = device_ips.get(agent_ip) if agent_ip else None
+                if device is not None and device.get('id') not in matched_devices:  # Device not already matched
+                    match_details = self._build_match(name, 'ip', agent, device, 'device')
+                    
+                    comparison['matched_items'].append(match_details)
+                    self._tally_match(match_tally, match_details)
+                    comparison['summary']['matched'] += 1
+                    matched_agents.add(agent_id)
+                    matched_devices.add(device.get('id'))
+                    continue
+                
+                comparison['unmatched_agents'].append(self._build_unmatched_agent(name, agent_id, agent))
                 comparison['summary']['unmatched_agents'] += 1
         
-        # Find unmatched devices (not matched by hostname or IP)
-        for device in devices:
-            if device and isinstance(device, dict) and device.get('id') not in matched_devices:
-                name = self._extract_hostname(device.get('name', ''))
-                comparison['unmatched_devices'].append({
-                    'name': name,
-                    'id': device.get('id'),
-                    'status': device.get('status', {}).get('value') if device.get('status') else None,
-                    'site': device.get('site', {}).get('name') if device.get('site') else None,
-                    'platform': device.get('platform', {}).get('name') if device.get('platform') else None,
-                    'primary_ip': self._get_primary_ip(device)
-                })
+        # Find unmatched devices (not matched by hostname or IP); the scan is skipped
+        # when there are as many matched ids as devices, i.e. all of them matched
+        for device in (devices if len(matched_devices) < len(devices) else ()):
+            if device and (device_id := device.get('id')) not in matched_devices:
+                comparison['unmatched_devices'].append(self._build_unmatched(device, device_id, 'device'))
                 comparison['summary']['unmatched_devices'] += 1
         
         # Generate detailed statistics
-        comparison['details'] = self._generate_comparison_details(comparison)
+        comparison['details'] = self._generate_comparison_details(comparison, match_tally)
         
         # Otomatik kaydet
         self.save_comparison_results(comparison, "output/comparison_devices_results.json")
@@ -329,8 +535,8 @@ class ComparisonService:
         print("=== Comparing Nessus Agents with Netbox Virtual Machines ===")
         
         # Get data from cache or API
-        agents = self._get_agents_data()
-        vms = self._get_vms_data()
+        agents, vms = self._load_data(self._get_agents_data, self._get_vms_data)
+        self._prefetch_fallback_ips(vms=vms)
         
         comparison = {
             'summary': {
@@ -346,131 +552,59 @@ class ComparisonService:
             'details': {}
         }
         
-        # Create lookup dictionaries by hostname
-        agent_names = {self._extract_hostname(agent.get('name', '')): agent for agent in agents if agent and isinstance(agent, dict) and agent.get('name')}
-        vm_names = {self._extract_hostname(vm.get('name', '')): vm for vm in vms if vm and isinstance(vm, dict) and vm.get('name')}
+        # Create hostname lookup for agents
+        agent_names, _ = self._get_lookups(agents)
         
-        # Create IP-based lookup for VMs
-        vm_ips = {}
-        for vm in vms:
-            if vm and isinstance(vm, dict):
-                ip = self._get_primary_ip(vm)
-                if ip:
-                    vm_ips[ip] = vm
+        # Create hostname and IP-based lookups for VMs
+        vm_names, vm_ips = self._get_lookups(vms)
         
         # Find matches by hostname first
-        matched_names = set(agent_names.keys()) & set(vm_names.keys())
+        matched_names = agent_names.keys() & vm_names.keys()
         matched_agents = set()
         matched_vms = set()
+        # Match type, status and platform counts for the details section
+        match_tally = Counter()
         
-        for name in tqdm(matched_names, desc="Matching agents/VMs by hostname"):
+        for name in _progress(matched_names, "Matching agents/VMs by hostname"):
             agent = agent_names[name]
             vm = vm_names[name]
             
-            match_details = {
-                'name': name,
-                'match_type': 'hostname',
-                'nessus_agent': {
-                    'id': agent.get('id'),
-                    'status': agent.get('status'),
-                    'platform': agent.get('platform'),
-                    'version': agent.get('version'),
-                    'last_connect': agent.get('last_connect'),
-                    'ip': agent.get('ip')
-                },
-                'netbox_vm': {
-                    'id': vm.get('id'),
-                    'status': vm.get('status', {}).get('value') if vm.get('status') else None,
-                    'cluster': vm.get('cluster', {}).get('name') if vm.get('cluster') else None,
-                    'platform': vm.get('platform', {}).get('name') if vm.get('platform') else None,
-                    'site': vm.get('site', {}).get('name') if vm.get('site') else None,
-                    'vcpus': vm.get('vcpus'),
-                    'memory': vm.get('memory'),
-                    'disk': vm.get('disk'),
-                    'primary_ip': self._get_primary_ip(vm),
-                    'all_ips': self._get_all_ips(vm)
-                },
-                'status_match': agent.get('status') == 'online' and vm.get('status', {}).get('value') == 'active',
-                'platform_match': agent.get('platform') == vm.get('platform', {}).get('name') if vm.get('platform') else False
-            }
+            match_details = self._build_match(name, 'hostname', agent, vm, 'vm')
             
             comparison['matched_items'].append(match_details)
+            self._tally_match(match_tally, match_details)
             comparison['summary']['matched'] += 1
             matched_agents.add(agent.get('id'))
             matched_vms.add(vm.get('id'))
         
-        # Find IP-based matches for remaining agents
-        for agent in agents:
-            if agent and isinstance(agent, dict) and agent.get('id') not in matched_agents:
-                agent_ip = agent.get('ip')  # Nessus agent IP field
-                if agent_ip and agent_ip in vm_ips:
-                    vm = vm_ips[agent_ip]
-                    if vm.get('id') not in matched_vms:  # VM not already matched
-                        name = self._extract_hostname(agent.get('name', ''))
-                        
-                        match_details = {
-                            'name': name,
-                            'match_type': 'ip',
-                            'nessus_agent': {
-                                'id': agent.get('id'),
-                                'status': agent.get('status'),
-                                'platform': agent.get('platform'),
-                                'version': agent.get('version'),
-                                'last_connect': agent.get('last_connect'),
-                                'ip': agent.get('ip')
-                            },
-                            'netbox_vm': {
-                                'id': vm.get('id'),
-                                'status': vm.get('status', {}).get('value') if vm.get('status') else None,
-                                'cluster': vm.get('cluster', {}).get('name') if vm.get('cluster') else None,
-                                'platform': vm.get('platform', {}).get('name') if vm.get('platform') else None,
-                                'site': vm.get('site', {}).get('name') if vm.get('site') else None,
-                                'vcpus': vm.get('vcpus'),
-                                'memory': vm.get('memory'),
-                                'disk': vm.get('disk'),
-                                'primary_ip': self._get_primary_ip(vm),
-                                'all_ips': self._get_all_ips(vm)
-                            },
-                            'status_match': agent.get('status') == 'online' and vm.get('status', {}).get('value') == 'active',
-                            'platform_match': agent.get('platform') == vm.get('platform', {}).get('name') if vm.get('platform') else False
-                        }
-                        
-                        comparison['matched_items'].append(match_details)
-                        comparison['summary']['matched'] += 1
-                        matched_agents.add(agent.get('id'))
-                        matched_vms.add(vm.get('id'))
-        
-        # Find unmatched agents (not matched by hostname or IP)
+        # Match remaining agents by IP, listing agents without any match as unmatched
         for agent in agents:
-            if agent and isinstance(agent, dict) and agent.get('id') not in matched_agents:
+            if agent and (agent_id := agent.get('id')) not in matched_agents:
                 name = self._extract_hostname(agent.get('name', ''))
-                comparison['unmatched_agents'].append({
-                    'name': name,
-                    'id': agent.get('id'),
-                    'status': agent.get('status'),
-                    'platform': agent.get('platform'),
-                    'version': agent.get('version'),
-                    'ip': agent.get('ip')
-                })
+                agent_ip = agent.get('ip')  # Nessus agent IP field
+                vm = vm_ips.get(agent_ip) if agent_ip else None
+                if vm is not None and vm.get('id') not in matched_vms:  # VM not already matched
+                    match_details = self._build_match(name, 'ip', agent, vm, 'vm')
+                    
+                    comparison['matched_items'].append(match_details)
+                    self._tally_match(match_tally, match_details)
+                    comparison['summary']['matched'] += 1
+                    matched_agents.add(agent_id)
+                    matched_vms.add(vm.get('id'))
+                    continue
+                
+                comparison['unmatched_agents'].append(self._build_unmatched_agent(name, agent_id, agent))
                 comparison['summary']['unmatched_agents'] += 1
         
-        # Find unmatched VMs (not matched by hostname or IP)
-        for vm in vms:
-            if vm and isinstance(vm, dict) and vm.get('id') not in matched_vms:
-                name = self._extract_hostname(vm.get('name', ''))
-                comparison['unmatched_vms'].append({
-                    'name': name,
-                    'id': vm.get('id'),
-                    'status': vm.get('status', {}).get('value') if vm.get('status') else None,
-                    'cluster': vm.get('cluster', {}).get('name') if vm.get('cluster') else None,
-                    'platform': vm.get('platform', {}).get('name') if vm.get('platform') else None,
-                    'site': vm.get('site', {}).get('name') if vm.get('site') else None,
-                    'primary_ip': self._get_primary_ip(vm)
-                })
+        # Find unmatched VMs (not matched by hostname or IP); the scan is skipped
+        # when there are as many matched ids as VMs, i.e. all of them matched
+        for vm in (vms if len(matched_vms) < len(vms) else ()):
+            if vm and (vm_id := vm.get('id')) not in matched_vms:
+                comparison['unmatched_vms'].append(self._build_unmatched(vm, vm_id, 'vm'))
                 comparison['summary']['unmatched_vms'] += 1
         
         # Generate detailed statistics
-        comparison['details'] = self._generate_comparison_details(comparison)
+        comparison['details'] = self._generate_comparison_details(comparison, match_tally)
         
         # Otomatik kaydet
         self.save_comparison_results(comparison, "output/comparison_vms_results.json")
@@ -481,24 +615,38 @@ class ComparisonService:
         
         return comparison
     
-    def _generate_comparison_details(self, comparison: Dict) -> Dict:
+    @staticmethod
+    def _tally_match(tally: Counter, match_details: Dict):
+        """
+        Count a match by type, status match and platform match
+        
+        Args:
+            tally: Counter updated in place
+            match_details: Match details built by _build_match
+        """
+        tally[match_details['match_type'] + '_matches'] += 1
+        tally['status_matches' if match_details['status_match'] else 'status_mismatches'] += 1
+        tally['platform_matches' if match_details['platform_match'] else 'platform_mismatches'] += 1
+    
+    def _generate_comparison_details(self, comparison: Dict, match_tally: Counter) -> Dict:
         """
         Generate detailed statistics for comparison
         
         Args:
             comparison: Comparison results dictionary
+            match_tally: Match counts collected with _tally_match
             
         Returns:
             Detailed statistics dictionary
         """
         details = {
             'status_analysis': {
-                'status_matches': 0,
-                'status_mismatches': 0
+                'status_matches': match_tally['status_matches'],
+                'status_mismatches': match_tally['status_mismatches']
             },
             'platform_analysis': {
-                'platform_matches': 0,
-                'platform_mismatches': 0
+                'platform_matches': match_tally['platform_matches'],
+                'platform_mismatches': match_tally['platform_mismatches']
             },
             'coverage_analysis': {
                 'nessus_coverage': 0.0,
@@ -506,18 +654,6 @@ class ComparisonService:
             }
         }
         
-        # Analyze matched items
-        for item in comparison['matched_items']:
-            if item.get('status_match'):
-                details['status_analysis']['status_matches'] += 1
-            else:
-                details['status_analysis']['status_mismatches'] += 1
-            
-            if item.get('platform_match'):
-                details['platform_analysis']['platform_matches'] += 1
-            else:
-                details['platform_analysis']['platform_mismatches'] += 1
-        
         # Calculate coverage percentages
         total_agents = comparison['summary']['total_agents']
         total_netbox_items = comparison['summary'].get('total_devices', comparison['summary'].get('total_vms', 0))
@@ -545,8 +681,7 @@ class ComparisonService:
         Returns:
             True if successful, False otherwise
         """
-        output_data = create_output_data_dict(comparison, "comparison_results")
-        return save_to_json(output_data, filename)
+        return save_dict_to_json(comparison, filename, "comparison_results")
     
     def print_comparison_summary(self, comparison: Dict, comparison_type: str):
         """
@@ -583,15 +718,19 @@ class ComparisonService:
         """
         Comprehensive comparison of Nessus agents with both Netbox devices and VMs
         
+        Agents are matched by hostname with devices, then with VMs, and the
+        remaining agents by IP with devices before VMs. Every pass is a hash
+        lookup against indexes built once per input list, so the comparison
+        is linear in the number of agents, devices and VMs.
+        
         Returns:
             Comprehensive comparison results
         """
         print("=== Comprehensive Comparison ===")
         
         # Get data from cache or API
-        agents = self._get_agents_data()
-        devices = self._get_devices_data()
-        vms = self._get_vms_data()
+        agents, devices, vms = self._load_data(self._get_agents_data, self._get_devices_data, self._get_vms_data)
+        self._prefetch_fallback_ips(devices=devices, vms=vms)
         
         comprehensive = {
             'summary': {
@@ -612,226 +751,98 @@ class ComparisonService:
             'details': {}
         }
         
-        # Create lookup dictionaries by hostname
-        agent_names = {self._extract_hostname(agent.get('name', '')): agent for agent in agents if agent and isinstance(agent, dict) and agent.get('name')}
-        device_names = {self._extract_hostname(device.get('name', '')): device for device in devices if device and isinstance(device, dict) and device.get('name')}
-        vm_names = {self._extract_hostname(vm.get('name', '')): vm for vm in vms if vm and isinstance(vm, dict) and vm.get('name')}
-        
-        # Create IP-based lookups
-        device_ips = {}
-        for device in devices:
-            if device and isinstance(device, dict):
-                ip = self._get_primary_ip(device)
-                if ip:
-                    device_ips[ip] = device
-        
-        vm_ips = {}
-        for vm in vms:
-            if vm and isinstance(vm, dict):
-                ip = self._get_primary_ip(vm)
-                if ip:
-                    vm_ips[ip] = vm
+        # Create hostname lookup for agents
+        agent_names, _ = self._get_lookups(agents)
+        
+        # Create hostname and IP-based lookups
+        device_names, device_ips = self._get_lookups(devices)
+        vm_names, vm_ips = self._get_lookups(vms)
         
         # Track matched items
         matched_agents = set()
         matched_devices = set()
         matched_vms = set()
+        # Match type, status and platform counts for the details section
+        match_tally = Counter()
         
         # First: Match agents with devices by hostname
-        device_hostname_matches = set(agent_names.keys()) & set(device_names.keys())
-        for name in tqdm(device_hostname_matches, desc="Matching agents/devices by hostname"):
+        device_hostname_matches = agent_names.keys() & device_names.keys()
+        for name in _progress(device_hostname_matches, "Matching agents/devices by hostname"):
             agent = agent_names[name]
             device = device_names[name]
             
-            match_details = {
-                'name': name,
-                'match_type': 'hostname',
-                'nessus_agent': {
-                    'id': agent.get('id'),
-                    'status': agent.get('status'),
-                    'platform': agent.get('platform'),
-                    'version': agent.get('version'),
-                    'last_connect': agent.get('last_connect'),
-                    'ip': agent.get('ip')
-                },
-                'netbox_device': {
-                    'id': device.get('id'),
-                    'status': device.get('status', {}).get('value') if device.get('status') else None,
-                    'site': device.get('site', {}).get('name') if device.get('site') else None,
-                    'platform': device.get('platform', {}).get('name') if device.get('platform') else None,
-                    'device_type': device.get('device_type', {}).get('model') if device.get('device_type') else None,
-                    'primary_ip': self._get_primary_ip(device),
-                    'all_ips': self._get_all_ips(device)
-                },
-                'status_match': agent.get('status') == 'online' and device.get('status', {}).get('value') == 'active',
-                'platform_match': agent.get('platform') == device.get('platform', {}).get('name') if device.get('platform') else False
-            }
+            match_details = self._build_match(name, 'hostname', agent, device, 'device')
             
             comprehensive['device_matches'].append(match_details)
+            self._tally_match(match_tally, match_details)
             comprehensive['summary']['matched_with_devices'] += 1
             matched_agents.add(agent.get('id'))
             matched_devices.add(device.get('id'))
         
         # Second: Match remaining agents with VMs by hostname
-        vm_hostname_matches = set(agent_names.keys()) & set(vm_names.keys())
-        for name in tqdm(vm_hostname_matches, desc="Matching agents/VMs by hostname"):
-            if name not in device_hostname_matches:  # Only if not already matched with device
-                agent = agent_names[name]
-                vm = vm_names[name]
-                
-                match_details = {
-                    'name': name,
-                    'match_type': 'hostname',
-                    'nessus_agent': {
-                        'id': agent.get('id'),
-                        'status': agent.get('status'),
-                        'platform': agent.get('platform'),
-                        'version': agent.get('version'),
-                        'last_connect': agent.get('last_connect'),
-                        'ip': agent.get('ip')
-                    },
-                    'netbox_vm': {
-                        'id': vm.get('id'),
-                        'status': vm.get('status', {}).get('value') if vm.get('status') else None,
-                        'cluster': vm.get('cluster', {}).get('name') if vm.get('cluster') else None,
-                        'platform': vm.get('platform', {}).get('name') if vm.get('platform') else None,
-                        'site': vm.get('site', {}).get('name') if vm.get('site') else None,
-                        'vcpus': vm.get('vcpus'),
-                        'memory': vm.get('memory'),
-                        'disk': vm.get('disk'),
-                        'primary_ip': self._get_primary_ip(vm),
-                        'all_ips': self._get_all_ips(vm)
-                    },
-                    'status_match': agent.get('status') == 'online' and vm.get('status', {}).get('value') == 'active',
-                    'platform_match': agent.get('platform') == vm.get('platform', {}).get('name') if vm.get('platform') else False
-                }
-                
-                comprehensive['vm_matches'].append(match_details)
-                comprehensive['summary']['matched_with_vms'] += 1
-                matched_agents.add(agent.get('id'))
-                matched_vms.add(vm.get('id'))
+        # (names already matched with a device are removed before intersecting)
+        vm_hostname_matches = (agent_names.keys() - device_hostname_matches) & vm_names.keys()
+        for name in _progress(vm_hostname_matches, "Matching agents/VMs by hostname"):
+            agent = agent_names[name]
+            vm = vm_names[name]
+            
+            match_details = self._build_match(name, 'hostname', agent, vm, 'vm')
+            
+            comprehensive['vm_matches'].append(match_details)
+            self._tally_match(match_tally, match_details)
+            comprehensive['summary']['matched_with_vms'] += 1
+            matched_agents.add(agent.get('id'))
+            matched_vms.add(vm.get('id'))
         
-        # Third: IP-based matching for remaining agents
+        # Third: IP-based matching for remaining agents, listing agents without any match as unmatched
         for agent in agents:
-            if agent and isinstance(agent, dict) and agent.get('id') not in matched_agents:
+            if agent and (agent_id := agent.get('id')) not in matched_agents:
+                name = self._extract_hostname(agent.get('name', ''))
                 agent_ip = agent.get('ip')
                 if agent_ip:
                     # Try device first
-                    if agent_ip in device_ips and device_ips[agent_ip].get('id') not in matched_devices:
-                        device = device_ips[agent_ip]
-                        name = self._extract_hostname(agent.get('name', ''))
-                        
-                        match_details = {
-                            'name': name,
-                            'match_type': 'ip',
-                            'nessus_agent': {
-                                'id': agent.get('id'),
-                                'status': agent.get('status'),
-                                'platform': agent.get('platform'),
-                                'version': agent.get('version'),
-                                'last_connect': agent.get('last_connect'),
-                                'ip': agent.get('ip')
-                            },
-                            'netbox_device': {
-                                'id': device.get('id'),
-                                'status': device.get('status', {}).get('value') if device.get('status') else None,
-                                'site': device.get('site', {}).get('name') if device.get('site') else None,
-                                'platform': device.get('platform', {}).get('name') if device.get('platform') else None,
-                                'device_type': device.get('device_type', {}).get('model') if device.get('device_type') else None,
-                                'primary_ip': self._get_primary_ip(device),
-                                'all_ips': self._get_all_ips(device)
-                            },
-                            'status_match': agent.get('status') == 'online' and device.get('status', {}).get('value') == 'active',
-                            'platform_match': agent.get('platform') == device.get('platform', {}).get('name') if device.get('platform') else False
-                        }
+                    device = device_ips.get(agent_ip)
+                    if device is not None and device.get('id') not in matched_devices:
+                        match_details = self._build_match(name, 'ip', agent, device, 'device')
                         
                         comprehensive['device_matches'].append(match_details)
+                        self._tally_match(match_tally, match_details)
                         comprehensive['summary']['matched_with_devices'] += 1
-                        matched_agents.add(agent.get('id'))
+                        matched_agents.add(agent_id)
                         matched_devices.add(device.get('id'))
+                        continue
                     
                     # Try VM if not matched with device
-                    elif agent_ip in vm_ips and vm_ips[agent_ip].get('id') not in matched_vms:
-                        vm = vm_ips[agent_ip]
-                        name = self._extract_hostname(agent.get('name', ''))
-                        
-                        match_details = {
-                            'name': name,
-                            'match_type': 'ip',
-                            'nessus_agent': {
-                                'id': agent.get('id'),
-                                'status': agent.get('status'),
-                                'platform': agent.get('platform'),
-                                'version': agent.get('version'),
-                                'last_connect': agent.get('last_connect'),
-                                'ip': agent.get('ip')
-                            },
-                            'netbox_vm': {
-                                'id': vm.get('id'),
-                                'status': vm.get('status', {}).get('value') if vm.get('status') else None,
-                                'cluster': vm.get('cluster', {}).get('name') if vm.get('cluster') else None,
-                                'platform': vm.get('platform', {}).get('name') if vm.get('platform') else None,
-                                'site': vm.get('site', {}).get('name') if vm.get('site') else None,
-                                'vcpus': vm.get('vcpus'),
-                                'memory': vm.get('memory'),
-                                'disk': vm.get('disk'),
-                                'primary_ip': self._get_primary_ip(vm),
-                                'all_ips': self._get_all_ips(vm)
-                            },
-                            'status_match': agent.get('status') == 'online' and vm.get('status', {}).get('value') == 'active',
-                            'platform_match': agent.get('platform') == vm.get('platform', {}).get('name') if vm.get('platform') else False
-                        }
+                    vm = vm_ips.get(agent_ip)
+                    if vm is not None and vm.get('id') not in matched_vms:
+                        match_details = self._build_match(name, 'ip', agent, vm, 'vm')
                         
                         comprehensive['vm_matches'].append(match_details)
+                        self._tally_match(match_tally, match_details)
                         comprehensive['summary']['matched_with_vms'] += 1
-                        matched_agents.add(agent.get('id'))
+                        matched_agents.add(agent_id)
                         matched_vms.add(vm.get('id'))
-        
-        # Find unmatched agents
-        for agent in agents:
-            if agent and isinstance(agent, dict) and agent.get('id') not in matched_agents:
-                name = self._extract_hostname(agent.get('name', ''))
-                comprehensive['unmatched_agents'].append({
-                    'name': name,
-                    'id': agent.get('id'),
-                    'status': agent.get('status'),
-                    'platform': agent.get('platform'),
-                    'version': agent.get('version'),
-                    'ip': agent.get('ip')
-                })
+                        continue
+                
+                comprehensive['unmatched_agents'].append(self._build_unmatched_agent(name, agent_id, agent))
                 comprehensive['summary']['unmatched_agents'] += 1
         
-        # Find unmatched devices (not matched by hostname or IP)
-        for device in devices:
-            if device and isinstance(device, dict) and device.get('id') not in matched_devices:
-                name = self._extract_hostname(device.get('name', ''))
-                comprehensive['unmatched_devices'].append({
-                    'name': name,
-                    'id': device.get('id'),
-                    'status': device.get('status', {}).get('value') if device.get('status') else None,
-                    'site': device.get('site', {}).get('name') if device.get('site') else None,
-                    'platform': device.get('platform', {}).get('name') if device.get('platform') else None,
-                    'primary_ip': self._get_primary_ip(device)
-                })
+        # Find unmatched devices (not matched by hostname or IP); the scan is skipped
+        # when there are as many matched ids as devices, i.e. all of them matched
+        for device in (devices if len(matched_devices) < len(devices) else ()):
+            if device and (device_id := device.get('id')) not in matched_devices:
+                comprehensive['unmatched_devices'].append(self._build_unmatched(device, device_id, 'device'))
                 comprehensive['summary']['unmatched_devices'] += 1
         
-        # Find unmatched VMs (not matched by hostname or IP)
-        for vm in vms:
-            if vm and isinstance(vm, dict) and vm.get('id') not in matched_vms:
-                name = self._extract_hostname(vm.get('name', ''))
-                comprehensive['unmatched_vms'].append({
-                    'name': name,
-                    'id': vm.get('id'),
-                    'status': vm.get('status', {}).get('value') if vm.get('status') else None,
-                    'cluster': vm.get('cluster', {}).get('name') if vm.get('cluster') else None,
-                    'platform': vm.get('platform', {}).get('name') if vm.get('platform') else None,
-                    'site': vm.get('site', {}).get('name') if vm.get('site') else None,
-                    'primary_ip': self._get_primary_ip(vm)
-                })
+        # Find unmatched VMs (not matched by hostname or IP); the scan is skipped
+        # when there are as many matched ids as VMs, i.e. all of them matched
+        for vm in (vms if len(matched_vms) < len(vms) else ()):
+            if vm and (vm_id := vm.get('id')) not in matched_vms:
+                comprehensive['unmatched_vms'].append(self._build_unmatched(vm, vm_id, 'vm'))
                 comprehensive['summary']['unmatched_vms'] += 1
         
         # Generate detailed statistics
-        comprehensive['details'] = self._generate_comprehensive_details(comprehensive)
+        comprehensive['details'] = self._generate_comprehensive_details(comprehensive, match_tally)
         
         # Otomatik kaydet
         self.save_comparison_results(comprehensive, "output/comprehensive_comparison_results.json")
@@ -842,12 +853,13 @@ class ComparisonService:
         
         return comprehensive
 
-    def _generate_comprehensive_details(self, comprehensive: Dict) -> Dict:
+    def _generate_comprehensive_details(self, comprehensive: Dict, match_tally: Counter) -> Dict:
         """
         Generate detailed statistics for comprehensive comparison
         
         Args:
             comprehensive: Comprehensive comparison results
+            match_tally: Match counts collected with _tally_match
             
         Returns:
             Detailed statistics dictionary
@@ -860,16 +872,16 @@ class ComparisonService:
                 'unmatched_netbox_items': comprehensive['summary']['unmatched_devices'] + comprehensive['summary']['unmatched_vms']
             },
             'match_type_analysis': {
-                'hostname_matches': 0,
-                'ip_matches': 0
+                'hostname_matches': match_tally['hostname_matches'],
+                'ip_matches': match_tally['ip_matches']
             },
             'status_analysis': {
-                'status_matches': 0,
-                'status_mismatches': 0
+                'status_matches': match_tally['status_matches'],
+                'status_mismatches': match_tally['status_mismatches']
             },
             'platform_analysis': {
-                'platform_matches': 0,
-                'platform_mismatches': 0
+                'platform_matches': match_tally['platform_matches'],
+                'platform_mismatches': match_tally['platform_mismatches']
             }
         }
         
@@ -880,57 +892,78 @@ class ComparisonService:
                 (details['coverage_analysis']['total_matched'] / total_netbox) * 100, 2
             )
         
-        # Analyze device matches
-        for match in comprehensive['device_matches']:
-            if match.get('match_type') == 'hostname':
-                details['match_type_analysis']['hostname_matches'] += 1
-            elif match.get('match_type') == 'ip':
-                details['match_type_analysis']['ip_matches'] += 1
-            
-            if match.get('status_match'):
-                details['status_analysis']['status_matches'] += 1
-            else:
-                details['status_analysis']['status_mismatches'] += 1
-            
-            if match.get('platform_match'):
-                details['platform_analysis']['platform_matches'] += 1
-            else:
-                details['platform_analysis']['platform_mismatches'] += 1
-        
-        # Analyze VM matches
-        for match in comprehensive['vm_matches']:
-            if match.get('match_type') == 'hostname':
-                details['match_type_analysis']['hostname_matches'] += 1
-            elif match.get('match_type') == 'ip':
-                details['match_type_analysis']['ip_matches'] += 1
-            
-            if match.get('status_match'):
-                details['status_analysis']['status_matches'] += 1
-            else:
-                details['status_analysis']['status_mismatches'] += 1
-            
-            if match.get('platform_match'):
-                details['platform_analysis']['platform_matches'] += 1
-            else:
-                details['platform_analysis']['platform_mismatches'] += 1
-        
         return details
 
-    def _get_all_ips(self, item: Dict) -> List[str]:
+    def _prefetch_fallback_ips(self, devices: Collection[Dict] = (), vms: Collection[Dict] = ()):
+        """
+        Fetch the IPs of items without interface data in batched requests
+        
+        _get_all_ips falls back to the Netbox API for such items; fetching them
+        up front replaces one request per matched item with a few id-filtered
+        requests. Items that fail here still use the per-item fallback.
+        
+        Args:
+            devices: Netbox devices about to be compared
+            vms: Netbox VMs about to be compared
+        """
+        for kind, items in (('device', devices), ('vm', vms)):
+            pending = []
+            for item in items:
+                if not item or item.get('interfaces') or not item.get('id'):
+                    continue
+                cached = self._ips_cache.get(id(item)) or self._fallback_ips.get(id(item))
+                if cached and cached[0] is item:
+                    continue
+                pending.append(item)
+            if not pending:
+                continue
+            
+            ids = [item.get('id') for item in pending]
+            try:
+                if kind == 'vm':
+                    ips_by_id = self.netbox_service.get_ips_for_vms(ids)
+                else:
+                    ips_by_id = self.netbox_service.get_ips_for_devices(ids)
+            except Exception as e:
+                print(f"Warning: Could not prefetch IP addresses: {e}")
+                continue
+            for item in pending:
+                self._fallback_ips[id(item)] = (item, ips_by_id.get(item.get('id'), []))
+    
+    def _get_all_ips(self, item: Dict, kind: str, primary_ip: Optional[str] = None) -> List[str]:
         """
         Get all IP addresses for a Netbox item (device or VM)
         
+        Results are memoized per item like _netbox_record, so the interface
+        scan and any API fallback run once per item.
+        
         Args:
             item: Netbox device or VM dictionary
+            kind: 'device' or 'vm'
+            primary_ip: Primary IP already extracted from item, if available
             
         Returns:
             List of all IP addresses
         """
+        key = id(item)
+        cached = self._ips_cache.get(key)
+        if cached and cached[0] is item:
+            return cached[1]
+        
         ips = []
+        seen = set()
+        
+        def add_ip(ip_addr: str):
+            clean_ip = ip_addr.partition('/')[0]  # Remove CIDR
+            if clean_ip not in seen:
+                seen.add(clean_ip)
+                ips.append(clean_ip)
         
         # Primary IP
-        primary_ip = self._get_primary_ip(item)
+        if primary_ip is None:
+            primary_ip = self._get_primary_ip(item)
         if primary_ip:
+            seen.add(primary_ip)
             ips.append(primary_ip)
         
         # Check if item has interface information (from fetch_all_virtual_machines)
@@ -943,39 +976,31 @@ class ComparisonService:
                     if isinstance(ip_data, dict):
                         ip_addr = ip_data.get('address', '')
                         if ip_addr:
-                            clean_ip = ip_addr.split('/')[0]  # Remove CIDR
-                            if clean_ip not in ips:
-                                ips.append(clean_ip)
+                            add_ip(ip_addr)
         
         # If no interface data available, try API calls as fallback
         if not interfaces:
             try:
-                if 'virtualization.virtualmachine' in item.get('url', ''):
-                    # This is a VM
-                    vm_id = item.get('id')
-                    if vm_id:
-                        vm_ips = self.netbox_service.get_ips_for_vm(vm_id)
-                        for ip_data in vm_ips:
-                            ip_addr = ip_data.get('address', '')
-                            if ip_addr:
-                                clean_ip = ip_addr.split('/')[0]  # Remove CIDR
-                                if clean_ip not in ips:
-                                    ips.append(clean_ip)
+                prefetched = self._fallback_ips.get(key)
+                if prefetched and prefetched[0] is item:
+                    # Fetched in bulk by _prefetch_fallback_ips
+                    fallback_ips = prefetched[1]
+                elif not item.get('id'):
+                    fallback_ips = []
+                elif kind == 'vm':
+                    fallback_ips = self.netbox_service.get_ips_for_vm(item.get('id'))
                 else:
-                    # This is a device
-                    device_id = item.get('id')
-                    if device_id:
-                        device_ips = self.netbox_service.get_ips_for_device(device_id)
-                        for ip_data in device_ips:
-                            ip_addr = ip_data.get('address', '')
-                            if ip_addr:
-                                clean_ip = ip_addr.split('/')[0]  # Remove CIDR
-                                if clean_ip not in ips:
-                                    ips.append(clean_ip)
+                    fallback_ips = self.netbox_service.get_ips_for_device(item.get('id'))
+                
+                for ip_data in fallback_ips:
+                    ip_addr = ip_data.get('address', '')
+                    if ip_addr:
+                        add_ip(ip_addr)
             except Exception as e:
-                # If API call fails, just use primary IP
-                pass
+                # If API call fails, just use primary IP (and try again next time)
+                return ips
         
+        self._ips_cache[key] = (item, ips)
         return ips
 
  
\ No newline at end of file
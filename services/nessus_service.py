@@ -6,9 +6,11 @@ Business logic layer for Nessus operations.
 
 import json
 import os
-from typing import Dict, List, Optional
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 from api.nessus_client import NessusClient
-from utils.helpers import create_output_data, save_to_json
+from utils.helpers import create_output_data, save_records_to_json
 from utils.html_reporter import HTMLReporter
 from tqdm import tqdm
 
@@ -16,6 +18,9 @@ from tqdm import tqdm
 class NessusService:
     """Service layer for Nessus operations"""
     
+    # Seconds a fetched agents list may be reused by callers passing use_cache
+    FETCH_CACHE_TTL = 300
+    
     def __init__(self, client: NessusClient):
         """
         Initialize Nessus service
@@ -25,21 +30,34 @@ class NessusService:
         """
         self.client = client
         self.html_reporter = HTMLReporter()
+        
+        # Last fetched agents keyed by include_details: (fetch time, agents)
+        self._agents_cache: Dict[bool, Tuple[float, List[Dict]]] = {}
+        
+        # Cached agents grouped by a field, keyed by field: (agents, field value -> agents)
+        self._agent_groups: Dict[str, Tuple[List[Dict], Dict[Any, List[Dict]]]] = {}
     
     def test_connection(self) -> bool:
         """Test connection to Nessus"""
         return self.client.test_connection()
     
-    def fetch_all_agents(self, include_details: bool = True) -> List[Dict]:
+    def fetch_all_agents(self, include_details: bool = True, use_cache: bool = False) -> List[Dict]:
         """
         Fetch all agents with optional detailed information
         
         Args:
             include_details: Whether to fetch detailed info for each agent
+            use_cache: Whether to reuse agents fetched within FETCH_CACHE_TTL
             
         Returns:
             List of agent dictionaries
         """
+        if use_cache:
+            cached = self._agents_cache.get(include_details)
+            if cached and time.monotonic() - cached[0] < self.FETCH_CACHE_TTL:
+                print(f"Using {len(cached[1])} agents fetched earlier")
+                return cached[1]
+        
         print("Fetching agents from Nessus...")
         agents = self.client.get_agents()
         
@@ -49,30 +67,33 @@ class NessusService:
         
         print(f"Found {len(agents)} agents")
         
+        # Later IP searches are answered from the fetched agents
+        self.client.index_agents(agents)
+        
         # Otomatik kaydet
         output_data = create_output_data(agents, "nessus_agents")
-        save_to_json(output_data, "output/nessus_agents.json")
+        save_records_to_json(agents, "output/nessus_agents.json", "nessus_agents")
         
         # Generate HTML report
         html_file = self.html_reporter.generate_fetch_report(output_data, "agents")
         print(f"✓ HTML report saved to {html_file}")
         
         if include_details:
-            detailed_agents = []
-            for agent in tqdm(agents, desc="Fetching agent details"):
-                agent_id = agent.get('id')
-                if agent_id:
-                    details = self.client.get_agent_details(agent_id)
-                    if details:
-                        detailed_agents.append(details)
-                    else:
-                        detailed_agents.append(agent)  # Use basic info if details failed
-                else:
-                    detailed_agents.append(agent)
+            # Details requests are independent, so they run concurrently
+            print("Fetching agent details...")
+            agent_ids = [agent['id'] for agent in agents if agent.get('id')]
+            details = tqdm(self.client.iter_agents_details(agent_ids), total=len(agent_ids),
+                           desc="Fetching agent details")
+            details_by_id = dict(zip(agent_ids, details))
+            
+            # Use basic info if details failed or the agent has no ID
+            detailed_agents = [details_by_id.get(agent.get('id')) or agent for agent in agents]
             # Detaylı veriyi de kaydet
             self.save_agents_to_file(detailed_agents, "output/nessus_agents.json")
+            self._agents_cache[True] = (time.monotonic(), detailed_agents)
             return detailed_agents
         
+        self._agents_cache[False] = (time.monotonic(), agents)
         return agents
     
     def fetch_agents_by_status(self, status: str) -> List[Dict]:
@@ -85,8 +106,7 @@ class NessusService:
         Returns:
             List of filtered agent dictionaries
         """
-        agents = self.fetch_all_agents(include_details=False)
-        return [agent for agent in agents if agent.get('status') == status]
+        return list(self._group_agents_by('status').get(status, []))
     
     def fetch_agents_by_platform(self, platform: str) -> List[Dict]:
         """
@@ -98,8 +118,31 @@ class NessusService:
         Returns:
             List of filtered agent dictionaries
         """
-        agents = self.fetch_all_agents(include_details=True)
-        return [agent for agent in agents if agent.get('platform') == platform]
+        return list(self._group_agents_by('platform').get(platform, []))
+    
+    def _group_agents_by(self, field: str) -> Dict[Any, List[Dict]]:
+        """
+        Group the cached basic agent list by a field
+        
+        The grouping is rebuilt only when fetch_all_agents returns a new list,
+        so repeated filters are dictionary lookups.
+        
+        Args:
+            field: Agent field to group by (e.g. 'status', 'platform')
+            
+        Returns:
+            Dictionary mapping field value to agents
+        """
+        agents = self.fetch_all_agents(include_details=False, use_cache=True)
+        cached = self._agent_groups.get(field)
+        if cached and cached[0] is agents:
+            return cached[1]
+        
+        groups = defaultdict(list)
+        for agent in agents:
+            groups[agent.get(field)].append(agent)
+        self._agent_groups[field] = (agents, groups)
+        return groups
     
     def save_agents_to_file(self, agents: List[Dict], filename: str) -> bool:
         """
@@ -112,8 +155,7 @@ class NessusService:
         Returns:
             True if successful, False otherwise
         """
-        output_data = create_output_data(agents, "agents")
-        return save_to_json(output_data, filename)
+        return save_records_to_json(agents, filename, "agents")
     
     def get_agent_statistics(self, agents: List[Dict]) -> Dict:
         """
@@ -128,27 +170,12 @@ class NessusService:
         if not agents:
             return {}
         
-        stats = {
+        return {
             'total_agents': len(agents),
-            'by_status': {},
-            'by_platform': {},
-            'by_version': {}
+            'by_status': dict(Counter(agent.get('status', 'unknown') for agent in agents)),
+            'by_platform': dict(Counter(agent.get('platform', 'unknown') for agent in agents)),
+            'by_version': dict(Counter(agent.get('version', 'unknown') for agent in agents))
         }
-        
-        for agent in agents:
-            # Status statistics
-            status = agent.get('status', 'unknown')
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-            
-            # Platform statistics
-            platform = agent.get('platform', 'unknown')
-            stats['by_platform'][platform] = stats['by_platform'].get(platform, 0) + 1
-            
-            # Version statistics
-            version = agent.get('version', 'unknown')
-            stats['by_version'][version] = stats['by_version'].get(version, 0) + 1
-        
-        return stats
     
     def fetch_all_scans(self) -> List[Dict]:
         """
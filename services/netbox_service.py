@@ -4,10 +4,11 @@ Netbox Service
 Business logic layer for Netbox operations.
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from api.netbox_client import NetboxClient
-from utils.helpers import create_output_data, create_output_data_dict, save_to_json
-from tqdm import tqdm
+from utils.helpers import create_output_data, normalize_ip, save_dict_to_json, save_records_to_json
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 import threading
@@ -23,29 +24,44 @@ class Spinner:
         self.desc = desc
         self.spinner = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
         self.stop_running = threading.Event()
-        self.thread = threading.Thread(target=self.animate)
+        # Daemon, so a fetch that raises before stop() cannot keep the process alive
+        self.thread = threading.Thread(target=self.animate, daemon=True)
         self.i = 0
+        # Animation frames are only useful on a terminal, not in redirected output
+        self.enabled = sys.stdout.isatty()
 
     def animate(self):
         while not self.stop_running.is_set():
             sys.stdout.write(f'\r{self.desc} {self.spinner[self.i % len(self.spinner)]}')
             sys.stdout.flush()
-            time.sleep(0.1)
+            # Returns as soon as stop() is called instead of finishing the frame
+            self.stop_running.wait(0.1)
             self.i += 1
         sys.stdout.write('\r' + ' ' * (len(self.desc) + 4) + '\r')
         sys.stdout.flush()
 
     def start(self):
-        self.thread.start()
+        if self.enabled:
+            self.thread.start()
 
     def stop(self):
         self.stop_running.set()
-        self.thread.join()
+        if self.thread.is_alive():
+            self.thread.join()
 
 
 class NetboxService:
     """Service layer for Netbox operations"""
     
+    # Seconds fetched Netbox listings may be reused by callers passing use_cache
+    FETCH_CACHE_TTL = 300
+    
+    # Fields requested for the interfaces and IP addresses attached to fetched
+    # devices and VMs. Netbox 4.0+ returns only these (plus the parent reference);
+    # older versions ignore the parameter and return full objects.
+    INTERFACE_FIELDS = 'id,name,type,enabled,mac_address,description'
+    INTERFACE_IP_FIELDS = 'id,address,status,dns_name,description,assigned_object_type,assigned_object_id'
+    
     def __init__(self, client: NetboxClient):
         """
         Initialize Netbox service
@@ -55,82 +71,147 @@ class NetboxService:
         """
         self.client = client
         self.html_reporter = HTMLReporter()
+        
+        # Last fetched devices and VMs keyed by filters: (fetch time, items, IP index).
+        # The IP index maps normalized IPs to items and is only built for the
+        # unfiltered listing, the only one complete enough to answer IP searches.
+        self._devices_cache: Dict[Tuple, Tuple[float, List[Dict], Optional[Dict[str, List[Dict]]]]] = {}
+        self._vms_cache: Dict[Tuple, Tuple[float, List[Dict], Optional[Dict[str, List[Dict]]]]] = {}
+        
+        # IP addresses grouped by interface type and interface ID: (fetch time, total count, groups)
+        self._interface_ips: Optional[Tuple[float, int, Dict[str, Dict[int, List[Dict]]]]] = None
+        self._interface_ips_lock = threading.Lock()
+        
+        # Last fetched sites and IP addresses keyed by filters: (fetch time, items)
+        self._sites_cache: Dict[Tuple, Tuple[float, List[Dict]]] = {}
+        self._ip_addresses_cache: Dict[Tuple, Tuple[float, List[Dict]]] = {}
     
     def test_connection(self) -> bool:
         """Test connection to Netbox"""
         return self.client.test_connection()
     
-    def fetch_all_devices(self, **filters) -> List[Dict]:
+    def fetch_all_devices(self, use_cache: bool = False, **filters) -> List[Dict]:
         """
         Fetch all devices from Netbox
         
         Args:
+            use_cache: Whether to reuse devices fetched within FETCH_CACHE_TTL
             **filters: Optional filters for devices
             
         Returns:
             List of device dictionaries
         """
-        print("Fetching devices from Netbox...")
+        cache_key = tuple(sorted(filters.items()))
+        if use_cache:
+            devices = self._get_cached(self._devices_cache, cache_key)
+            if devices is not None:
+                print(f"Using {len(devices)} devices fetched earlier")
+                return devices
+        
+        print("Fetching devices, interfaces and IP addresses from Netbox...")
         spinner = Spinner("Loading devices")
         spinner.start()
-        devices = self.client.get_devices(**filters)
-        spinner.stop()
+        try:
+            # The three listings are independent, so their pages are fetched concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                devices_future = executor.submit(self.client.get_devices, **filters)
+                interfaces_future = executor.submit(self.client.get_all_device_interfaces,
+                                                    fields=self.INTERFACE_FIELDS + ',device')
+                ips_future = executor.submit(self._get_interface_ips, use_cache)
+                devices = devices_future.result()
+                all_device_interfaces = interfaces_future.result()
+                ip_count, interface_ips = ips_future.result()
+        finally:
+            spinner.stop()
         print(f"Found {len(devices)} devices")
+        print(f"Found {ip_count} IP addresses")
         
-        # Fetch interface information for all devices
-        print("Fetching interface information...")
-        all_device_interfaces = self.client.get_all_device_interfaces()
-        
-        # Fetch all IP addresses with pagination
-        print("Fetching IP addresses...")
-        all_ips = self.client.get_ip_addresses()
-        print(f"Found {len(all_ips)} IP addresses")
-        
-        # Group interfaces by device ID
-        device_interfaces = {}
-        for interface in all_device_interfaces:
-            device_id = interface.get('device', {}).get('id')
-            if device_id:
-                if device_id not in device_interfaces:
-                    device_interfaces[device_id] = []
-                device_interfaces[device_id].append(interface)
-        
-        # Group IP addresses by interface ID for device interfaces
-        device_interface_ips = {}
-        for ip_data in all_ips:
-            if (ip_data.get('assigned_object_type') == 'dcim.interface' and 
-                ip_data.get('assigned_object_id')):
-                interface_id = ip_data.get('assigned_object_id')
-                if interface_id not in device_interface_ips:
-                    device_interface_ips[interface_id] = []
-                device_interface_ips[interface_id].append(ip_data)
-        
-        # Add interface information to devices
-        for device in devices:
-            device_id = device.get('id')
-            if device_id in device_interfaces:
-                device['interfaces'] = device_interfaces[device_id]
-                # Add IP addresses to interfaces
-                for interface in device['interfaces']:
-                    interface_id = interface.get('id')
-                    if interface_id in device_interface_ips:
-                        interface['ip_addresses'] = device_interface_ips[interface_id]
-                    else:
-                        interface['ip_addresses'] = []
-            else:
-                device['interfaces'] = []
+        self._attach_interfaces(devices, all_device_interfaces, 'device', interface_ips['dcim.interface'])
         
-        self.save_devices_to_file(devices, "output/netbox_devices.json")
+        ip_index = self._build_ip_index(devices) if not cache_key else None
         
         # Otomatik kaydet
-        output_data = create_output_data(devices, "netbox_devices")
-        save_to_json(output_data, "output/netbox_devices.json")
+        self._persist_and_report(devices, "output/netbox_devices.json", "netbox_devices", "devices")
+        
+        self._devices_cache[cache_key] = (time.monotonic(), devices, ip_index)
+        return devices
+    
+    def _persist_and_report(self, items: List[Dict], filename: str, data_type: str, report_kind: str):
+        """
+        Save fetched devices or VMs to file and generate their HTML report
+        
+        Args:
+            items: Device or VM dictionaries
+            filename: Output filename
+            data_type: Type of data stored in the file (e.g., "netbox_devices")
+            report_kind: Type of data shown in the report (e.g., "devices")
+        """
+        save_records_to_json(items, filename, data_type)
         
         # Generate HTML report
-        html_file = self.html_reporter.generate_fetch_report(output_data, "devices")
+        output_data = create_output_data(items, data_type)
+        html_file = self.html_reporter.generate_fetch_report(output_data, report_kind)
         print(f"✓ HTML report saved to {html_file}")
+    
+    def _get_interface_ips(self, use_cache: bool = False) -> Tuple[int, Dict[str, Dict[int, List[Dict]]]]:
+        """
+        Fetch all IP addresses grouped by interface type and interface ID
         
-        return devices
+        Device and VM interface IPs come from the same listing, so both are
+        grouped in one pass. With use_cache the groups are shared by
+        fetch_all_devices and fetch_all_virtual_machines within
+        FETCH_CACHE_TTL, and concurrent callers wait for a single fetch.
+        
+        Args:
+            use_cache: Whether to reuse IP addresses fetched within FETCH_CACHE_TTL
+            
+        Returns:
+            Tuple of the total number of IP addresses and a dictionary mapping
+            'dcim.interface' and 'virtualization.vminterface' to dictionaries
+            of interface ID to IP address dictionaries
+        """
+        with self._interface_ips_lock:
+            cached = self._interface_ips
+            if use_cache and cached and time.monotonic() - cached[0] < self.FETCH_CACHE_TTL:
+                return cached[1:]
+            
+            all_ips = self.client.get_ip_addresses(fields=self.INTERFACE_IP_FIELDS)
+            
+            groups = {'dcim.interface': defaultdict(list), 'virtualization.vminterface': defaultdict(list)}
+            for ip_data in all_ips:
+                interface_ips = groups.get(ip_data.get('assigned_object_type'))
+                interface_id = ip_data.get('assigned_object_id')
+                if interface_ips is not None and interface_id:
+                    interface_ips[interface_id].append(ip_data)
+            
+            self._interface_ips = (time.monotonic(), len(all_ips), groups)
+            return len(all_ips), groups
+    
+    @staticmethod
+    def _attach_interfaces(items: List[Dict], interfaces: List[Dict], parent_key: str,
+                           interface_ips: Dict[int, List[Dict]]):
+        """
+        Add interfaces and their IP addresses to devices or VMs
+        
+        Args:
+            items: Device or VM dictionaries, updated in place
+            interfaces: All interfaces of the item kind
+            parent_key: Interface field referencing the item ('device' or 'virtual_machine')
+            interface_ips: IP address dictionaries keyed by interface ID
+        """
+        # Group interfaces by item ID
+        item_interfaces = defaultdict(list)
+        for interface in interfaces:
+            parent = interface.get(parent_key)
+            item_id = parent.get('id') if parent else None
+            if item_id:
+                item_interfaces[item_id].append(interface)
+        
+        for item in items:
+            attached = item_interfaces.get(item.get('id'), [])
+            for interface in attached:
+                interface['ip_addresses'] = interface_ips.get(interface.get('id'), [])
+            item['interfaces'] = attached
     
     def fetch_device_by_name(self, name: str) -> Optional[Dict]:
         """
@@ -180,6 +261,7 @@ class NetboxService:
             Created device dictionary or None if error
         """
         print(f"Creating device: {device_data.get('name', 'Unknown')}")
+        self._devices_cache.clear()
         return self.client.create_device(device_data)
     
     def update_device(self, device_id: int, device_data: Dict) -> Optional[Dict]:
@@ -194,6 +276,7 @@ class NetboxService:
             Updated device dictionary or None if error
         """
         print(f"Updating device {device_id}")
+        self._devices_cache.clear()
         return self.client.update_device(device_id, device_data)
     
     def delete_device(self, device_id: int) -> bool:
@@ -207,33 +290,58 @@ class NetboxService:
             True if successful, False otherwise
         """
         print(f"Deleting device {device_id}")
+        self._devices_cache.clear()
         return self.client.delete_device(device_id)
     
-    def fetch_all_sites(self) -> List[Dict]:
+    def _get_cached(self, cache: Dict[Tuple, Tuple], cache_key: Tuple, field: int = 1) -> Any:
+        """Return a field of a cache entry (the listing by default) if it was fetched within FETCH_CACHE_TTL"""
+        cached = cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.FETCH_CACHE_TTL:
+            return cached[field]
+        return None
+    
+    def fetch_all_sites(self, use_cache: bool = False) -> List[Dict]:
         """
         Fetch all sites from Netbox
         
+        Args:
+            use_cache: Whether to reuse sites fetched within FETCH_CACHE_TTL
+            
         Returns:
             List of site dictionaries
         """
+        if use_cache:
+            sites = self._get_cached(self._sites_cache, ())
+            if sites is not None:
+                return sites
+        
         print("Fetching sites from Netbox...")
         sites = self.client.get_sites()
         print(f"Found {len(sites)} sites")
+        self._sites_cache[()] = (time.monotonic(), sites)
         return sites
     
-    def fetch_all_ip_addresses(self, **filters) -> List[Dict]:
+    def fetch_all_ip_addresses(self, use_cache: bool = False, **filters) -> List[Dict]:
         """
         Fetch all IP addresses from Netbox
         
         Args:
+            use_cache: Whether to reuse IP addresses fetched within FETCH_CACHE_TTL
             **filters: Optional filters for IP addresses
             
         Returns:
             List of IP address dictionaries
         """
+        cache_key = tuple(sorted(filters.items()))
+        if use_cache:
+            ip_addresses = self._get_cached(self._ip_addresses_cache, cache_key)
+            if ip_addresses is not None:
+                return ip_addresses
+        
         print("Fetching IP addresses from Netbox...")
         ip_addresses = self.client.get_ip_addresses(**filters)
         print(f"Found {len(ip_addresses)} IP addresses")
+        self._ip_addresses_cache[cache_key] = (time.monotonic(), ip_addresses)
         return ip_addresses
     
     def create_ip_address(self, ip_data: Dict) -> Optional[Dict]:
@@ -247,6 +355,8 @@ class NetboxService:
             Created IP address dictionary or None if error
         """
         print(f"Creating IP address: {ip_data.get('address', 'Unknown')}")
+        self._ip_addresses_cache.clear()
+        self._interface_ips = None
         return self.client.create_ip_address(ip_data)
     
     def save_devices_to_file(self, devices: List[Dict], filename: str) -> bool:
@@ -260,8 +370,22 @@ class NetboxService:
         Returns:
             True if successful, False otherwise
         """
-        output_data = create_output_data(devices, "devices")
-        return save_to_json(output_data, filename)
+        return save_records_to_json(devices, filename, "devices")
+    
+    @staticmethod
+    def _count_by(items: List[Dict], field: str, key: str) -> Dict[str, int]:
+        """
+        Count items by a value of a nested Netbox object
+        
+        Args:
+            items: Device or VM dictionaries
+            field: Nested object field (e.g. 'status', 'site')
+            key: Key within the nested object (e.g. 'value', 'name')
+            
+        Returns:
+            Dictionary mapping value to count, 'unknown' for missing objects
+        """
+        return dict(Counter((item.get(field) or {}).get(key, 'unknown') for item in items))
     
     def get_device_statistics(self, devices: List[Dict]) -> Dict:
         """
@@ -276,108 +400,59 @@ class NetboxService:
         if not devices:
             return {}
         
-        stats = {
+        valid_devices = [device for device in devices if device]  # Skip None or empty device objects
+        return {
             'total_devices': len(devices),
-            'by_status': {},
-            'by_site': {},
-            'by_device_type': {},
-            'by_platform': {}
+            'by_status': self._count_by(valid_devices, 'status', 'value'),
+            'by_site': self._count_by(valid_devices, 'site', 'name'),
+            'by_device_type': self._count_by(valid_devices, 'device_type', 'model'),
+            'by_platform': self._count_by(valid_devices, 'platform', 'name')
         }
-        
-        for device in devices:
-            if not device:  # Skip None or empty device objects
-                continue
-                
-            # Status statistics
-            status_obj = device.get('status')
-            status = status_obj.get('value', 'unknown') if status_obj else 'unknown'
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-            
-            # Site statistics
-            site_obj = device.get('site')
-            site = site_obj.get('name', 'unknown') if site_obj else 'unknown'
-            stats['by_site'][site] = stats['by_site'].get(site, 0) + 1
-            
-            # Device type statistics
-            device_type_obj = device.get('device_type')
-            device_type = device_type_obj.get('model', 'unknown') if device_type_obj else 'unknown'
-            stats['by_device_type'][device_type] = stats['by_device_type'].get(device_type, 0) + 1
-            
-            # Platform statistics
-            platform_obj = device.get('platform')
-            platform = platform_obj.get('name', 'unknown') if platform_obj else 'unknown'
-            stats['by_platform'][platform] = stats['by_platform'].get(platform, 0) + 1
-        
-        return stats
     
-    def fetch_all_virtual_machines(self, **filters) -> List[Dict]:
+    def fetch_all_virtual_machines(self, use_cache: bool = False, **filters) -> List[Dict]:
         """
         Fetch all virtual machines from Netbox
         
         Args:
+            use_cache: Whether to reuse VMs fetched within FETCH_CACHE_TTL
             **filters: Optional filters for VMs
             
         Returns:
             List of VM dictionaries with interface information
         """
-        print("Fetching virtual machines from Netbox...")
+        cache_key = tuple(sorted(filters.items()))
+        if use_cache:
+            vms = self._get_cached(self._vms_cache, cache_key)
+            if vms is not None:
+                print(f"Using {len(vms)} virtual machines fetched earlier")
+                return vms
+        
+        print("Fetching virtual machines, interfaces and IP addresses from Netbox...")
         spinner = Spinner("Loading VMs")
         spinner.start()
-        vms = self.client.get_virtual_machines(**filters)
-        spinner.stop()
+        try:
+            # The three listings are independent, so their pages are fetched concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                vms_future = executor.submit(self.client.get_virtual_machines, **filters)
+                interfaces_future = executor.submit(self.client.get_all_vm_interfaces,
+                                                    fields=self.INTERFACE_FIELDS + ',virtual_machine')
+                ips_future = executor.submit(self._get_interface_ips, use_cache)
+                vms = vms_future.result()
+                all_interfaces = interfaces_future.result()
+                ip_count, interface_ips = ips_future.result()
+        finally:
+            spinner.stop()
         print(f"Found {len(vms)} virtual machines")
+        print(f"Found {ip_count} IP addresses")
         
-        # Fetch interface information for all VMs
-        print("Fetching interface information...")
-        all_interfaces = self.client.get_all_vm_interfaces()
-        
-        # Fetch all IP addresses with pagination
-        print("Fetching IP addresses...")
-        all_ips = self.client.get_ip_addresses()
-        print(f"Found {len(all_ips)} IP addresses")
-        
-        # Group interfaces by VM ID
-        vm_interfaces = {}
-        for interface in all_interfaces:
-            vm_id = interface.get('virtual_machine', {}).get('id')
-            if vm_id:
-                if vm_id not in vm_interfaces:
-                    vm_interfaces[vm_id] = []
-                vm_interfaces[vm_id].append(interface)
-        
-        # Group IP addresses by interface ID for VM interfaces
-        vm_interface_ips = {}
-        for ip_data in all_ips:
-            if (ip_data.get('assigned_object_type') == 'virtualization.vminterface' and 
-                ip_data.get('assigned_object_id')):
-                interface_id = ip_data.get('assigned_object_id')
-                if interface_id not in vm_interface_ips:
-                    vm_interface_ips[interface_id] = []
-                vm_interface_ips[interface_id].append(ip_data)
-        
-        # Add interface information to VMs
-        for vm in vms:
-            vm_id = vm.get('id')
-            if vm_id in vm_interfaces:
-                vm['interfaces'] = vm_interfaces[vm_id]
-                # Add IP addresses to interfaces
-                for interface in vm['interfaces']:
-                    interface_id = interface.get('id')
-                    if interface_id in vm_interface_ips:
-                        interface['ip_addresses'] = vm_interface_ips[interface_id]
-                    else:
-                        interface['ip_addresses'] = []
-            else:
-                vm['interfaces'] = []
+        self._attach_interfaces(vms, all_interfaces, 'virtual_machine', interface_ips['virtualization.vminterface'])
         
-        # Save VMs with interfaces to file
-        self.save_vms_to_file(vms, "output/netbox_vms.json")
+        ip_index = self._build_ip_index(vms) if not cache_key else None
         
-        # Generate HTML report
-        output_data = create_output_data(vms, "netbox_vms")
-        html_file = self.html_reporter.generate_fetch_report(output_data, "virtual_machines")
-        print(f"✓ HTML report saved to {html_file}")
+        # Save VMs with interfaces to file
+        self._persist_and_report(vms, "output/netbox_vms.json", "netbox_vms", "virtual_machines")
         
+        self._vms_cache[cache_key] = (time.monotonic(), vms, ip_index)
         return vms
     
     def fetch_vm_by_name(self, name: str) -> Optional[Dict]:
@@ -404,14 +479,7 @@ class NetboxService:
         Returns:
             True if successful, False otherwise
         """
-        output_data = create_output_data(vms, "netbox_vms")
-        save_to_json(output_data, "output/netbox_vms.json")
-        
-        # Generate HTML report
-        html_file = self.html_reporter.generate_fetch_report(output_data, "vms")
-        print(f"✓ HTML report saved to {html_file}")
-        
-        return True
+        return save_records_to_json(vms, filename, "vms")
     
     def get_vm_statistics(self, vms: List[Dict]) -> Dict:
         """
@@ -426,39 +494,37 @@ class NetboxService:
         if not vms:
             return {}
         
-        stats = {
+        valid_vms = [vm for vm in vms if vm]  # Skip None or empty VM objects
+        return {
             'total_vms': len(vms),
-            'by_status': {},
-            'by_site': {},
-            'by_platform': {},
-            'by_cluster': {}
+            'by_status': self._count_by(valid_vms, 'status', 'value'),
+            'by_site': self._count_by(valid_vms, 'site', 'name'),
+            'by_platform': self._count_by(valid_vms, 'platform', 'name'),
+            'by_cluster': self._count_by(valid_vms, 'cluster', 'name')
         }
+    
+    @staticmethod
+    def _build_ip_index(items: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Index devices or VMs by the IP addresses on their interfaces
         
-        for vm in vms:
-            if not vm:  # Skip None or empty VM objects
-                continue
-                
-            # Status statistics
-            status_obj = vm.get('status')
-            status = status_obj.get('value', 'unknown') if status_obj else 'unknown'
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-            
-            # Site statistics
-            site_obj = vm.get('site')
-            site = site_obj.get('name', 'unknown') if site_obj else 'unknown'
-            stats['by_site'][site] = stats['by_site'].get(site, 0) + 1
-            
-            # Platform statistics
-            platform_obj = vm.get('platform')
-            platform = platform_obj.get('name', 'unknown') if platform_obj else 'unknown'
-            stats['by_platform'][platform] = stats['by_platform'].get(platform, 0) + 1
+        Args:
+            items: Device or VM dictionaries with interface information
             
-            # Cluster statistics
-            cluster_obj = vm.get('cluster')
-            cluster = cluster_obj.get('name', 'unknown') if cluster_obj else 'unknown'
-            stats['by_cluster'][cluster] = stats['by_cluster'].get(cluster, 0) + 1
-        
-        return stats
+        Returns:
+            Dictionary mapping normalized IP address to list of items
+        """
+        index = {}
+        for item in items:
+            ips = set()
+            for interface in item.get('interfaces') or []:
+                for ip_data in interface.get('ip_addresses') or []:
+                    ip = normalize_ip(ip_data.get('address') or '')
+                    if ip:
+                        ips.add(ip)
+            for ip in ips:
+                index.setdefault(ip, []).append(item)
+        return index
     
     def search_devices_by_ip(self, ip_address: str) -> List[Dict]:
         """
@@ -471,7 +537,11 @@ class NetboxService:
             List of matching device dictionaries
         """
         print(f"Searching for devices with IP: {ip_address}")
-        devices = self.client.get_devices_by_ip(ip_address)
+        ip_index = self._get_cached(self._devices_cache, (), 2)
+        if ip_index is not None:
+            devices = list(ip_index.get(normalize_ip(ip_address), []))
+        else:
+            devices = self.client.get_devices_by_ip(ip_address)
         print(f"Found {len(devices)} devices with IP {ip_address}")
         return devices
     
@@ -486,7 +556,11 @@ class NetboxService:
             List of VM dictionaries with matching IP
         """
         print(f"Searching for virtual machines with IP: {ip_address}")
-        vms = self.client.get_vms_by_ip(ip_address)
+        ip_index = self._get_cached(self._vms_cache, (), 2)
+        if ip_index is not None:
+            vms = list(ip_index.get(normalize_ip(ip_address), []))
+        else:
+            vms = self.client.get_vms_by_ip(ip_address)
         print(f"Found {len(vms)} virtual machines with IP {ip_address}")
         return vms
     
@@ -514,6 +588,30 @@ class NetboxService:
         """
         return self.client.get_ips_for_device(device_id)
     
+    def get_ips_for_vms(self, vm_ids: List[int]) -> Dict[int, List[Dict]]:
+        """
+        Get IP addresses for many virtual machines in batched requests
+        
+        Args:
+            vm_ids: Virtual machine IDs
+            
+        Returns:
+            Dictionary mapping each virtual machine ID to a list of IP address dictionaries
+        """
+        return self.client.get_ips_for_vms(vm_ids)
+    
+    def get_ips_for_devices(self, device_ids: List[int]) -> Dict[int, List[Dict]]:
+        """
+        Get IP addresses for many devices in batched requests
+        
+        Args:
+            device_ids: Device IDs
+            
+        Returns:
+            Dictionary mapping each device ID to a list of IP address dictionaries
+        """
+        return self.client.get_ips_for_devices(device_ids)
+    
     def search_all_by_ip(self, ip_address: str) -> Dict:
         """
         Search both devices and virtual machines by IP address
@@ -526,8 +624,11 @@ class NetboxService:
         """
         print(f"Searching Netbox for IP: {ip_address}")
         
-        devices = self.search_devices_by_ip(ip_address)
-        vms = self.search_vms_by_ip(ip_address)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            devices_future = executor.submit(self.search_devices_by_ip, ip_address)
+            vms_future = executor.submit(self.search_vms_by_ip, ip_address)
+            devices = devices_future.result()
+            vms = vms_future.result()
         
         return {
             'devices': devices,
@@ -545,40 +646,34 @@ class NetboxService:
         Returns:
             List of created/updated device dictionaries
         """
-        synced_devices = []
+        # Look up all existing devices up front instead of once per agent
+        existing_devices = self.client.get_devices_by_names(
+            [agent.get('name', 'Unknown Agent') for agent in nessus_agents]
+        )
         
-        for agent in tqdm(nessus_agents, desc="Syncing agents to Netbox"):
+        # Keyed by name so a repeated agent name results in a single write
+        updates = {}
+        creates = {}
+        for agent in nessus_agents:
             agent_name = agent.get('name', 'Unknown Agent')
-            agent_ip = agent.get('distro', 'Unknown IP')
-            
-            # Check if device already exists
-            existing_device = self.fetch_device_by_name(agent_name)
+            device_data = {
+                'name': agent_name,
+                'status': 'active' if agent.get('status') == 'online' else 'inactive',
+                'platform': agent.get('platform', 'Unknown'),
+                'serial': agent.get('uuid', ''),
+                'comments': f"Nessus Agent - Version: {agent.get('version', 'Unknown')}"
+            }
             
+            existing_device = existing_devices.get(agent_name)
             if existing_device:
-                # Update existing device
                 print(f"Updating existing device: {agent_name}")
-                updated_device = self.update_device(existing_device['id'], {
-                    'name': agent_name,
-                    'status': 'active' if agent.get('status') == 'online' else 'inactive',
-                    'platform': agent.get('platform', 'Unknown'),
-                    'serial': agent.get('uuid', ''),
-                    'comments': f"Nessus Agent - Version: {agent.get('version', 'Unknown')}"
-                })
-                if updated_device:
-                    synced_devices.append(updated_device)
+                updates[agent_name] = {'id': existing_device['id'], **device_data}
             else:
-                # Create new device
                 print(f"Creating new device: {agent_name}")
-                new_device = self.create_device({
-                    'name': agent_name,
-                    'device_type': {'name': 'Server'},
-                    'status': 'active' if agent.get('status') == 'online' else 'inactive',
-                    'platform': agent.get('platform', 'Unknown'),
-                    'serial': agent.get('uuid', ''),
-                    'comments': f"Nessus Agent - Version: {agent.get('version', 'Unknown')}"
-                })
-                if new_device:
-                    synced_devices.append(new_device)
+                creates[agent_name] = {'name': agent_name, 'device_type': {'name': 'Server'}, **device_data}
+        
+        synced_devices = (self.client.update_devices(list(updates.values())) +
+                          self.client.create_devices(list(creates.values())))
         
         # Sync sonuçlarını kaydet
         sync_results = {
@@ -587,8 +682,10 @@ class NetboxService:
             'sync_details': synced_devices,
             'timestamp': datetime.now().isoformat()
         }
-        output_data = create_output_data_dict(sync_results)
-        save_to_json(output_data, "output/sync_results.json")
+        save_dict_to_json(sync_results, "output/sync_results.json")
+        
+        # Devices were created or updated, so earlier fetches are stale
+        self._devices_cache.clear()
         
         return synced_devices
 
@@ -4,10 +4,58 @@ Helper Functions
 Common utility functions used across the application.
 """
 
+import ipaddress
 import json
 import os
+import queue
+import threading
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Number of records encoded into each chunk handed to the writer thread
+WRITE_BATCH_SIZE = 1000
+
+# Characters not allowed in filenames, mapped to underscores
+_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode JSON data, using orjson when it is installed
+    
+    Args:
+        data: JSON document as str or bytes
+        
+    Returns:
+        Decoded data
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data: Any, indent: bool = False) -> bytes:
+    """
+    Encode data as UTF-8 JSON, using orjson when it is installed
+    
+    Args:
+        data: Data to encode
+        indent: Whether to indent the output with two spaces
+        
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
 
 
 def save_to_json(data: Dict[str, Any], filename: str) -> bool:
@@ -23,10 +71,74 @@ def save_to_json(data: Dict[str, Any], filename: str) -> bool:
     """
     try:
         # Ensure directory exists
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with open(filename, 'wb') as f:
+            f.write(json_dumps(data, indent=True))
+        
+        print(f"Successfully saved data to {filename}")
+        return True
+        
+    except IOError as e:
+        print(f"Error saving to {filename}: {e}")
+        return False
+
+
+def _write_chunks(f, chunks: queue.Queue, errors: List[Exception]):
+    """
+    Write encoded chunks from a queue to a file until None is received
+    
+    Args:
+        f: Binary file object to write to
+        chunks: Queue of encoded chunks, terminated by None
+        errors: List receiving the first write error
+    """
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            return
+        if not errors:
+            try:
+                f.write(chunk)
+            except IOError as e:
+                errors.append(e)
+
+
+def _save_chunks(chunks: Iterable[bytes], filename: str) -> bool:
+    """
+    Write encoded JSON chunks to a file while the next ones are being encoded
+    
+    Args:
+        chunks: Encoded chunks of the JSON document, may be a generator
+        filename: Output filename
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        # Ensure directory exists
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb', buffering=1 << 20) as f:
+            # Bounded so encoding cannot run far ahead of the disk
+            pending = queue.Queue(maxsize=4)
+            errors = []
+            writer = threading.Thread(target=_write_chunks, args=(f, pending, errors), daemon=True)
+            writer.start()
+            try:
+                for chunk in chunks:
+                    pending.put(chunk)
+                    if errors:
+                        break
+            finally:
+                pending.put(None)
+                writer.join()
+            if errors:
+                raise errors[0]
         
         print(f"Successfully saved data to {filename}")
         return True
@@ -36,6 +148,97 @@ def save_to_json(data: Dict[str, Any], filename: str) -> bool:
         return False
 
 
+def _encode_array(records: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Encode records as a JSON array with one record per line
+    
+    Records are joined in batches of WRITE_BATCH_SIZE, so each yielded chunk
+    holds many records and the full array is never built in memory.
+    
+    Args:
+        records: Items to encode, may be a generator
+        
+    Returns:
+        Generator of encoded chunks, returning the number of records
+    """
+    yield b'[\n'
+    count = 0
+    # Reused for every chunk; each chunk is built with a single join
+    batch = []
+    for record in records:
+        if count and not batch:
+            batch.append(b'')  # Separates this chunk from the previous one
+        batch.append(json_dumps(record))
+        count += 1
+        if len(batch) >= WRITE_BATCH_SIZE:
+            yield b',\n'.join(batch)
+            batch.clear()
+    if batch:
+        yield b',\n'.join(batch)
+    yield b'\n]'
+    return count
+
+
+def _output_header(data_type: str) -> bytes:
+    """Encode the opening of a create_output_data style document up to its data value"""
+    return (b'{"timestamp": ' + json_dumps(format_timestamp()) +
+            b', "data_type": ' + json_dumps(data_type) + b', "data": ')
+
+
+def save_records_to_json(records: Iterable[Dict], filename: str, data_type: str = "data") -> bool:
+    """
+    Stream records to a JSON file in the create_output_data structure
+    
+    Records are encoded in batches of WRITE_BATCH_SIZE while a writer thread
+    drains the previous batch to disk, so the full output document is never
+    built in memory and encoding overlaps with file I/O.
+    
+    Args:
+        records: Data items to save, may be a generator
+        filename: Output filename
+        data_type: Type of data (e.g., "agents", "devices")
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    def chunks():
+        yield _output_header(data_type)
+        total_count = yield from _encode_array(records)
+        yield b', "total_count": ' + str(total_count).encode() + b'}\n'
+    
+    return _save_chunks(chunks(), filename)
+
+
+def save_dict_to_json(data: Dict[str, Any], filename: str, data_type: str = "data") -> bool:
+    """
+    Stream dictionary data to a JSON file in the create_output_data_dict structure
+    
+    List values (e.g. matched items) are written record by record like in
+    save_records_to_json; other values are encoded whole.
+    
+    Args:
+        data: Dictionary data with string keys
+        filename: Output filename
+        data_type: Type of data (e.g., "sync_results", "comparison_results")
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    def chunks():
+        yield _output_header(data_type) + b'{'
+        separator = b'\n'
+        for key, value in data.items():
+            yield separator + json_dumps(key) + b': '
+            separator = b',\n'
+            if isinstance(value, list):
+                yield from _encode_array(value)
+            else:
+                yield json_dumps(value)
+        yield b'\n}}\n'
+    
+    return _save_chunks(chunks(), filename)
+
+
 def load_from_json(filename: str) -> Dict[str, Any]:
     """
     Load data from JSON file
@@ -47,8 +250,8 @@ def load_from_json(filename: str) -> Dict[str, Any]:
         Loaded data dictionary or empty dict if error
     """
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filename, 'rb') as f:
+            return json_loads(f.read())
     except (IOError, json.JSONDecodeError) as e:
         print(f"Error loading from {filename}: {e}")
         return {}
@@ -106,6 +309,22 @@ def create_output_data_dict(data: Dict[str, Any], data_type: str = "data") -> Di
     }
 
 
+def normalize_ip(address: str) -> Optional[str]:
+    """
+    Normalize an IP address for lookups
+    
+    Args:
+        address: IP address, optionally with a prefix length (e.g. 10.0.0.1/24)
+        
+    Returns:
+        Compressed address without prefix length, or None if not a valid IP
+    """
+    try:
+        return ipaddress.ip_address(str(address).partition('/')[0].strip()).compressed
+    except ValueError:
+        return None
+
+
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename for safe file system usage
@@ -117,9 +336,7 @@ def sanitize_filename(filename: str) -> str:
         Sanitized filename
     """
     # Replace invalid characters
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
+    filename = filename.translate(_SANITIZE_TABLE)
     
     # Remove leading/trailing spaces and dots
     filename = filename.strip('. ')
@@ -182,14 +399,15 @@ def filter_data(data: List[Dict], filters: Dict[str, Any]) -> List[Dict]:
     if not filters:
         return data
     
+    # Unpacked once instead of for every item
+    criteria = tuple(filters.items())
+    
     filtered = []
     for item in data:
-        match = True
-        for field, value in filters.items():
+        for field, value in criteria:
             if field not in item or item[field] != value:
-                match = False
                 break
-        if match:
+        else:
             filtered.append(item)
     
     return filtered 
\ No newline at end of file
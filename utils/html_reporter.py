@@ -10,6 +10,9 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from jinja2 import Template
 
+# Number of rendered template fragments joined into each write
+STREAM_BUFFER_SIZE = 256
+
 
 class HTMLReporter:
     """HTML report generator for various data types"""
@@ -49,8 +52,8 @@ class HTMLReporter:
             return f'<span class="ip-nessus-only">{nessus_ip}</span>'
         
         # Clean IP addresses (remove CIDR notation)
-        nessus_clean = nessus_ip.split('/')[0] if nessus_ip else ''
-        netbox_clean = netbox_ip.split('/')[0] if netbox_ip else ''
+        nessus_clean = nessus_ip.partition('/')[0] if nessus_ip else ''
+        netbox_clean = netbox_ip.partition('/')[0] if netbox_ip else ''
         
         if nessus_clean == netbox_clean:
             # Same IP - show only one
@@ -131,8 +134,12 @@ class HTMLReporter:
         hostname_matches = details.get('match_type_analysis', {}).get('hostname_matches', 0)
         ip_matches = details.get('match_type_analysis', {}).get('ip_matches', 0)
         
-        # Generate HTML
-        html_content = self._get_comparison_template().render(
+        filename = f"comprehensive_comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        
+        # Generate HTML straight into the report file
+        return self._write_report(
+            self._get_comparison_template(),
+            filename,
             title="Comprehensive Nessus-Netbox Comparison Report",
             timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             summary=summary,
@@ -148,15 +155,6 @@ class HTMLReporter:
             report_type="comprehensive",
             format_ip=self._format_ip_comparison
         )
-        
-        # Save file
-        filename = f"comprehensive_comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return filepath
     
     def _generate_device_comparison_report(self, data: Dict) -> str:
         """Generate device comparison HTML report"""
@@ -167,7 +165,11 @@ class HTMLReporter:
         unmatched_agents = data.get('unmatched_agents', [])
         unmatched_devices = data.get('unmatched_devices', [])
         
-        html_content = self._get_comparison_template().render(
+        filename = f"device_comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        
+        return self._write_report(
+            self._get_comparison_template(),
+            filename,
             title="Nessus-Netbox Device Comparison Report",
             timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             summary=summary,
@@ -183,14 +185,6 @@ class HTMLReporter:
             report_type="devices",
             format_ip=self._format_ip_comparison
         )
-        
-        filename = f"device_comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return filepath
     
     def _generate_vm_comparison_report(self, data: Dict) -> str:
         """Generate VM comparison HTML report"""
@@ -201,7 +195,11 @@ class HTMLReporter:
         unmatched_agents = data.get('unmatched_agents', [])
         unmatched_vms = data.get('unmatched_vms', [])
         
-        html_content = self._get_comparison_template().render(
+        filename = f"vm_comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        
+        return self._write_report(
+            self._get_comparison_template(),
+            filename,
             title="Nessus-Netbox VM Comparison Report",
             timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             summary=summary,
@@ -217,14 +215,6 @@ class HTMLReporter:
             report_type="vms",
             format_ip=self._format_ip_comparison
         )
-        
-        filename = f"vm_comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return filepath
     
     def _generate_fetch_report(self, data: Dict, data_type: str) -> str:
         """Generate fetch results HTML report"""
@@ -232,7 +222,11 @@ class HTMLReporter:
         items = data.get('data', [])
         metadata = data.get('metadata', {})
         
-        html_content = self._get_fetch_template().render(
+        filename = f"{data_type}_fetch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        
+        return self._write_report(
+            self._get_fetch_template(),
+            filename,
             title=f"Netbox-Nessus {data_type.title()} Fetch Report",
             timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             data_type=data_type,
@@ -240,13 +234,33 @@ class HTMLReporter:
             metadata=metadata,
             total_count=len(items)
         )
+    
+    def _write_report(self, template: Template, filename: str, **context) -> str:
+        """
+        Render a template into a report file in the output directory
         
-        filename = f"{data_type}_fetch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        The template is streamed to the file, so the rendered report is never
+        held in memory as a single string. Fragments are joined in groups of
+        STREAM_BUFFER_SIZE so each write covers many small template pieces.
         
+        Args:
+            template: Report template
+            filename: Report filename
+            **context: Template variables
+            
+        Returns:
+            Path to generated HTML file
+        """
+        filepath = os.path.join(self.output_dir, filename)
+        try:
+            stream = template.stream(**context)
+            stream.enable_buffering(STREAM_BUFFER_SIZE)
+            stream.dump(filepath, encoding='utf-8')
+        except Exception:
+            # Do not leave a half-written report behind
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
         return filepath
     
     def _get_comparison_template(self) -> Template: